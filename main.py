@@ -1,15 +1,24 @@
 import os
+import asyncio
 import logging
+from contextlib import asynccontextmanager
+from typing import Optional
 from mcp.server.fastmcp import FastMCP
 from dotenv import load_dotenv
 
 # Import helper modules
-from utils.github_api import create_github_repository
+from utils.github_api import (
+    create_github_repository,
+    get_github_token,
+    close_http_client,
+)
 from utils.git_operations import (
+    wait_for_background_removals,
     clone_template_to_base_directory,
     generate_commit_message,
     push_to_github,
     create_file_in_project,
+    create_files_in_project,
     commit_and_push_changes
 )
 from utils.file_handling import (
@@ -22,17 +31,48 @@ load_dotenv()
 
 # --- Configuration & Constants ---
 
+
+@asynccontextmanager
+async def lifespan(server: FastMCP):
+    """Release shared resources when the server shuts down."""
+    try:
+        yield
+    finally:
+        await wait_for_background_removals()
+        await close_http_client()
+
+
 # Initialize FastMCP server
-mcp = FastMCP("website-generator")
+mcp = FastMCP("website-generator", lifespan=lifespan)
 
 # Template Repository
 TEMPLATE_REPO = "https://github.com/Jeetanshu18/react-vite"
 
-# Get GitHub token
-GITHUB_TOKEN = os.getenv("GITHUB_TOKEN")
+# Message returned by repo_setup on success
+REPO_SETUP_SUCCESS_TEMPLATE = """Repository setup completed successfully!
+
+Project Name: {project_name}
+Repository URL: {repo_url}
+Template Used: {template_repo}
+Local Directory: ./{project_name}
+
+Steps Completed:
+✅ Cloned React Vite template repository to base directory
+✅ Removed .git folder from template
+✅ Created new GitHub repository
+✅ Pushed code to GitHub repository
 
-if not GITHUB_TOKEN:
-    logging.warning("GITHUB_TOKEN environment variable not set.")
+Your website project is now ready for local development!
+
+Local Development Setup:
+1. Navigate to project: cd {project_name}
+2. Install dependencies: npm install
+3. Start development server: npm run dev
+4. Build for production: npm run build
+
+Repository Management:
+- Use push_changes tool to commit and push your changes
+- Project is already set up with git and connected to GitHub"""
 
 
 @mcp.tool()
@@ -47,7 +87,7 @@ async def repo_setup(
     This tool performs the following steps:
     1. Clone the React Vite template repository directly to base directory
     2. Remove the .git folder from the cloned repository
-    3. Create a new repository on GitHub with the given project name
+    3. Create a new repository on GitHub with the given project name (runs concurrently with steps 1-2)
     4. Push the code to the new GitHub repository
     5. Optionally deploy to AWS Amplify (if requested)
 
@@ -60,7 +100,7 @@ async def repo_setup(
         Status message with repository URL and deployment information
     """
     # Check for token at function call time
-    github_token = os.getenv("GITHUB_TOKEN")
+    github_token = get_github_token()
     if not github_token:
         return "GitHub Token is missing. Cannot process repository setup requests."
 
@@ -73,20 +113,44 @@ async def repo_setup(
     try:
         logging.info(f"Starting repository setup for project: {project_name}")
 
-        # Step 1: Clone template repository directly to base directory
-        logging.info("Step 1: Cloning template repository to base directory...")
+        # Steps 1 & 2 are independent, so clone the template while the
+        # GitHub repository is being created
+        logging.info(
+            "Steps 1-2: Cloning template repository and creating GitHub repository..."
+        )
         base_directory = "."
-        success, project_path = await clone_template_to_base_directory(
-            project_name, base_directory, TEMPLATE_REPO
+        clone_task = asyncio.create_task(
+            clone_template_to_base_directory(
+                project_name, base_directory, TEMPLATE_REPO
+            )
+        )
+        create_task = asyncio.create_task(
+            create_github_repository(project_name, description)
         )
-        if not success:
-            return f"Failed at Step 1: {project_path}"
 
-        # Step 2: Create GitHub repository
-        logging.info("Step 2: Creating GitHub repository...")
-        success, repo_url = await create_github_repository(project_name, description)
-        if not success:
-            return f"Failed at Step 2: {repo_url}"
+        steps = {clone_task: "Step 1", create_task: "Step 2"}
+        try:
+            # Check each step as soon as it finishes, so a failure in either
+            # one stops the setup without waiting for the other
+            pending = set(steps)
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in steps:
+                    if task in done:
+                        success, output = task.result()
+                        if not success:
+                            return f"Failed at {steps[task]}: {output}"
+        finally:
+            # Cancel the sibling of a failed step and retrieve both outcomes,
+            # so an exception is never left unretrieved
+            for task in steps:
+                task.cancel()
+            await asyncio.gather(*steps, return_exceptions=True)
+
+        _, project_path = clone_task.result()
+        _, repo_url = create_task.result()
 
         # Step 3: Push to GitHub
         logging.info("Step 3: Pushing code to GitHub...")
@@ -95,38 +159,17 @@ async def repo_setup(
             return f"Failed at Step 3: {message}"
 
         # Prepare success message
-        result_message = f"""
-Repository setup completed successfully!
-
-Project Name: {project_name}
-Repository URL: {repo_url.replace('.git', '')}
-Template Used: {TEMPLATE_REPO}
-Local Directory: ./{project_name}
-
-Steps Completed:
-✅ Cloned React Vite template repository to base directory
-✅ Removed .git folder from template
-✅ Created new GitHub repository
-✅ Pushed code to GitHub repository
-
-Your website project is now ready for local development!
-
-Local Development Setup:
-1. Navigate to project: cd {project_name}
-2. Install dependencies: npm install
-3. Start development server: npm run dev
-4. Build for production: npm run build
-
-Repository Management:
-- Use push_changes tool to commit and push your changes
-- Project is already set up with git and connected to GitHub
-        """
+        result_message = REPO_SETUP_SUCCESS_TEMPLATE.format(
+            project_name=project_name,
+            repo_url=repo_url.removesuffix(".git"),
+            template_repo=TEMPLATE_REPO,
+        )
 
         # Step 4: Optional Amplify deployment
         if deploy_to_amplify:
-            result_message += "\n⚠️  AWS Amplify deployment is not yet implemented but can be added in future updates."
+            result_message += "\n\n⚠️  AWS Amplify deployment is not yet implemented but can be added in future updates."
 
-        return result_message.strip()
+        return result_message
 
     except Exception as e:
         logging.error(f"Unexpected error during repository setup: {str(e)}")
@@ -188,7 +231,63 @@ The file is ready for use in your project.
 
 
 @mcp.tool()
-async def push_changes(project_name: str) -> str:
+async def create_files(files: list[dict[str, str]]) -> str:
+    """
+    Create several files in the project at once with content generated by the AI Agent.
+
+    Use this instead of calling create_file repeatedly when scaffolding many
+    files; the files are written concurrently.
+
+    Args:
+        files: List of files to create, each with "file_name", "file_path" and
+            "content" keys (same meaning as the create_file arguments)
+
+    Returns:
+        Status message indicating success or failure
+    """
+    if not files:
+        return "At least one file is required."
+
+    batch = []
+    for index, file in enumerate(files, start=1):
+        file_name = file.get("file_name", "")
+        file_path = file.get("file_path", "")
+        if not file_name or not file_name.strip():
+            return f"File {index}: File name is required and cannot be empty."
+        if not file_path or not file_path.strip():
+            return f"File {index}: File path is required and cannot be empty."
+        batch.append((file_path, file_name, file.get("content") or ""))
+
+    try:
+        logging.info(f"Creating {len(batch)} files")
+
+        success, message = await create_files_in_project(batch)
+
+        if success:
+            created = "\n".join(
+                f"✅ {os.path.join(file_path, file_name)}"
+                for file_path, file_name, _ in batch
+            )
+            result_message = f"""
+Files created successfully!
+
+Total Files: {len(batch)}
+
+{created}
+
+The files are ready for use in your project.
+"""
+            return result_message.strip()
+        else:
+            return f"Failed to create files: {message}"
+
+    except Exception as e:
+        logging.error(f"Unexpected error during file creation: {str(e)}")
+        return f"File creation failed due to unexpected error: {str(e)}"
+
+
+@mcp.tool()
+async def push_changes(project_name: str, file_paths: Optional[list[str]] = None) -> str:
     """
     Commit the changes made to the project and push them to the remote repository.
 
@@ -203,6 +302,12 @@ async def push_changes(project_name: str) -> str:
 
     Args:
         project_name: Name of the project (same as used in repo_setup)
+        file_paths: Optional list of the files created since the last push,
+            relative to the current directory or to the project (e.g.
+            "./my-website/src/App.jsx" or "src/App.jsx"). Only these new
+            files and changes to already tracked files are staged, which is
+            faster on large projects. By default every change in the project
+            is staged.
 
     Returns:
         Status message indicating success or failure
@@ -232,7 +337,9 @@ async def push_changes(project_name: str) -> str:
         )
 
         # Commit and push changes
-        success, message = await commit_and_push_changes(project_path, commit_message)
+        success, message = await commit_and_push_changes(
+            project_path, commit_message, paths=file_paths
+        )
 
         if success:
             if "No changes to commit" in message:
@@ -416,7 +523,7 @@ if __name__ == "__main__":
     )
 
     # Check for GitHub Token at startup
-    if not GITHUB_TOKEN:
+    if not get_github_token():
         logging.critical(
             "GITHUB_TOKEN is not set. The server cannot communicate with GitHub API."
         )
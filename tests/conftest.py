@@ -0,0 +1,28 @@
+"""
+Shared pytest configuration for the website generator test suite.
+"""
+
+import os
+import sys
+
+import pytest
+
+# Add parent directory to path so test modules can import main and utils
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.github_api import refresh_github_token, close_http_client
+
+
+@pytest.fixture(autouse=True)
+def fresh_github_token():
+    """Make every test read GITHUB_TOKEN from its own (patched) environment."""
+    refresh_github_token()
+    yield
+    refresh_github_token()
+
+
+@pytest.fixture(scope="session", autouse=True)
+async def shared_http_client():
+    """Share the GitHub HTTP client across the session and close it at the end."""
+    yield
+    await close_http_client()
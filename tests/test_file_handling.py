@@ -5,71 +5,117 @@ This module contains tests for the file handling tools to ensure they work corre
 """
 
 import os
-import tempfile
 import pytest
 from utils.file_handling import read_file, list_files, update_file
 
 
+@pytest.fixture(scope="module")
+def tmp_root(tmp_path_factory):
+    """Temporary directory shared by all tests in this module."""
+    return tmp_path_factory.mktemp("file_handling")
+
+
+@pytest.mark.xdist_group(name="file_handling")
 class TestFileHandling:
     """Test class for file handling utilities."""
 
-    @pytest.mark.asyncio
-    async def test_read_file(self):
+    async def test_read_file(self, tmp_root):
         """Test reading a file."""
-        with tempfile.TemporaryDirectory() as temp_dir:
-            file_path = os.path.join(temp_dir, "test_read.txt")
-            content = "Test content for reading"
-            
-            # Create file first
-            with open(file_path, 'w') as f:
-                f.write(content)
-            
-            success, read_content = await read_file(file_path)
-            
-            assert success is True
-            assert read_content == content
-
-    @pytest.mark.asyncio
-    async def test_update_file(self):
+        file_path = str(tmp_root / "test_read.txt")
+        content = "Test content for reading"
+        
+        # Create file first
+        with open(file_path, 'w') as f:
+            f.write(content)
+        
+        success, read_content = await read_file(file_path)
+        
+        assert success is True
+        assert read_content == content
+
+    async def test_read_file_rejects_directory(self, tmp_root):
+        """Test that reading a directory reports it is not a file."""
+        success, error = await read_file(str(tmp_root))
+
+        assert success is False
+        assert "is not a file" in error
+
+    async def test_read_file_rejects_invalid_utf8(self, tmp_root):
+        """Test that a file that is not UTF-8 is reported as undecodable."""
+        file_path = tmp_root / "test_binary.bin"
+        file_path.write_bytes(b"\xff\xfe\x00binary")
+
+        success, error = await read_file(str(file_path))
+
+        assert success is False
+        assert "Unable to decode file as UTF-8" in error
+
+    async def test_update_file(self, tmp_root):
         """Test updating an existing file."""
-        with tempfile.TemporaryDirectory() as temp_dir:
-            file_path = os.path.join(temp_dir, "test_update.txt")
-            original_content = "Original content"
-            new_content = "Updated content"
-            
-            # Create file first
-            with open(file_path, 'w') as f:
-                f.write(original_content)
-            
-            success, message = await update_file(file_path, new_content)
-            
-            assert success is True
-            assert "Successfully updated file" in message
-            
-            # Verify updated content
-            with open(file_path, 'r') as f:
-                assert f.read() == new_content
-
-    @pytest.mark.asyncio
-    async def test_list_files(self):
+        file_path = str(tmp_root / "test_update.txt")
+        original_content = "Original content"
+        new_content = "Updated content"
+        
+        # Create file first
+        with open(file_path, 'w') as f:
+            f.write(original_content)
+        
+        success, message = await update_file(file_path, new_content)
+        
+        assert success is True
+        assert "Successfully updated file" in message
+        
+        # Verify updated content
+        with open(file_path, 'r') as f:
+            assert f.read() == new_content
+
+    async def test_list_files(self, tmp_root):
         """Test listing files in a directory."""
-        with tempfile.TemporaryDirectory() as temp_dir:
-            # Create some test files and directories
-            test_file = os.path.join(temp_dir, "test.txt")
-            test_dir = os.path.join(temp_dir, "test_dir")
-            
-            with open(test_file, 'w') as f:
-                f.write("test")
-            os.makedirs(test_dir)
-            
-            success, items = await list_files(temp_dir)
-            
-            assert success is True
-            assert isinstance(items, list)
-            assert "[FILE] test.txt" in items
-            assert "[DIR] test_dir" in items
-
-    @pytest.mark.asyncio
+        # Use a dedicated subdirectory so other tests' files don't show up
+        temp_dir = tmp_root / "test_list"
+        temp_dir.mkdir()
+
+        # Create some test files and directories
+        test_file = os.path.join(temp_dir, "test.txt")
+        test_dir = os.path.join(temp_dir, "test_dir")
+        
+        with open(test_file, 'w') as f:
+            f.write("test")
+        os.makedirs(test_dir)
+        
+        success, items = await list_files(str(temp_dir))
+        
+        assert success is True
+        assert isinstance(items, list)
+        assert "[FILE] test.txt" in items
+        assert "[DIR] test_dir" in items
+
+    async def test_list_files_lists_directories_first(self, tmp_root):
+        """Test that directories are listed before files, each sorted by name."""
+        temp_dir = tmp_root / "test_list_order"
+        temp_dir.mkdir()
+        (temp_dir / "b.txt").write_text("b")
+        (temp_dir / "a.txt").write_text("a")
+        (temp_dir / "z_dir").mkdir()
+        (temp_dir / "c_dir").mkdir()
+
+        success, items = await list_files(str(temp_dir))
+
+        assert success is True
+        assert items == ["[DIR] c_dir", "[DIR] z_dir", "[FILE] a.txt", "[FILE] b.txt"]
+
+    async def test_list_files_follows_directory_symlinks(self, tmp_root):
+        """Test that a symlink to a directory is listed as a directory."""
+        temp_dir = tmp_root / "test_list_symlinks"
+        temp_dir.mkdir()
+        (temp_dir / "real_dir").mkdir()
+        (temp_dir / "linked_dir").symlink_to(temp_dir / "real_dir")
+
+        success, items = await list_files(str(temp_dir))
+
+        assert success is True
+        assert items == ["[DIR] linked_dir", "[DIR] real_dir"]
+
     async def test_error_handling(self):
         """Test error handling for invalid operations."""
         # Test reading non-existent file
@@ -77,12 +123,20 @@ class TestFileHandling:
         assert success is False
         assert "does not exist" in error
         
+        # Test listing a non-existent directory and a file
+        success, error = await list_files("non_existent_dir")
+        assert success is False
+        assert "does not exist" in error
+
+        success, error = await list_files(__file__)
+        assert success is False
+        assert "is not a directory" in error
+
         # Test updating non-existent file
         success, error = await update_file("non_existent_file.txt", "content")
         assert success is False
         assert "does not exist" in error
 
-    @pytest.mark.asyncio
     async def test_empty_parameters(self):
         """Test handling of empty parameters."""
         # Test empty file path
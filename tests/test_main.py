@@ -1,17 +1,44 @@
 import pytest
 import asyncio
+import httpx
+import respx
 import os
-import sys
-import tempfile
-import shutil
-from unittest.mock import patch, MagicMock, AsyncMock
+from datetime import datetime
+from types import SimpleNamespace
+from unittest.mock import patch, AsyncMock, MagicMock
 
-# Add parent directory to path to import main module
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from main import mcp, repo_setup, create_file, create_files, push_changes, generate_commit_message
+from utils.github_api import MAX_RETRIES, make_github_request, create_github_repository, get_github_token, refresh_github_token, get_auth_headers, get_http_client, close_http_client
+from utils.git_operations import CLONE_TIMEOUT, SCRIPT_TIMEOUT, run_command, run_shell, cached_template, run_steps, remove_tree, wait_for_background_removals, clone_template_to_base_directory, push_to_github, create_file_in_project, create_files_in_project, commit_and_push_changes
+
+
+@pytest.fixture
+def mocked_pipeline(monkeypatch):
+    """Set a GitHub token and replace the three repo_setup steps with mocks that succeed by default."""
+    monkeypatch.setenv("GITHUB_TOKEN", "test_token")
+    pipeline = SimpleNamespace(
+        clone=AsyncMock(return_value=(True, "./test-project")),
+        create=AsyncMock(return_value=(True, "https://github.com/user/test-project.git")),
+        push=AsyncMock(return_value=(True, "Successfully pushed to GitHub")),
+    )
+    monkeypatch.setattr("main.clone_template_to_base_directory", pipeline.clone)
+    monkeypatch.setattr("main.create_github_repository", pipeline.create)
+    monkeypatch.setattr("main.push_to_github", pipeline.push)
+    return pipeline
+
+
+@pytest.fixture
+def mocked_commit(monkeypatch):
+    """Stub out push_changes' filesystem checks and the commit/push step."""
+    commit = AsyncMock(return_value=(True, "Successfully committed and pushed changes"))
+    monkeypatch.setattr("os.path.exists", lambda path: True)
+    monkeypatch.setattr("main.commit_and_push_changes", commit)
+    monkeypatch.setattr(
+        "main.generate_commit_message",
+        lambda: "Auto-commit: Update project files - 2025-01-02 23:05:00",
+    )
+    return commit
 
-from main import mcp, repo_setup, create_file, push_changes, generate_commit_message
-from utils.github_api import make_github_request, create_github_repository
-from utils.git_operations import run_command, push_to_github, create_file_in_project, commit_and_push_changes
 
 class TestWebsiteGeneratorMCP:
     """Test suite for the website generator MCP server."""
@@ -21,42 +48,302 @@ class TestWebsiteGeneratorMCP:
         assert mcp.name == "website-generator"
         assert hasattr(mcp, 'tool')
     
-    @pytest.mark.asyncio
     async def test_make_github_request_without_token(self):
         """Test GitHub API request fails without token."""
         with patch.dict(os.environ, {}, clear=True):
             result = await make_github_request("GET", "/user")
             assert result is None
     
-    @pytest.mark.asyncio
+    def test_github_token_is_cached_until_refreshed(self):
+        """Test that the GitHub token is read once and re-read after a refresh."""
+        with patch.dict(os.environ, {"GITHUB_TOKEN": "first_token"}):
+            assert get_github_token() == "first_token"
+        with patch.dict(os.environ, {"GITHUB_TOKEN": "second_token"}):
+            assert get_github_token() == "first_token"
+            refresh_github_token()
+            assert get_github_token() == "second_token"
+
+    def test_auth_headers_are_cached_per_token(self, monkeypatch):
+        """Test that the Authorization header is built once and rebuilt after a refresh."""
+        monkeypatch.setenv("GITHUB_TOKEN", "first_token")
+        headers = get_auth_headers()
+        assert headers == {"Authorization": "token first_token"}
+        assert get_auth_headers() is headers
+
+        monkeypatch.setenv("GITHUB_TOKEN", "second_token")
+        refresh_github_token()
+        assert get_auth_headers() == {"Authorization": "token second_token"}
+
+        monkeypatch.delenv("GITHUB_TOKEN")
+        refresh_github_token()
+        assert get_auth_headers() is None
+
+    @respx.mock
     async def test_make_github_request_success(self):
         """Test successful GitHub API request."""
         mock_response = {"login": "testuser"}
-        
+        route = respx.get("https://api.github.com/user").mock(
+            return_value=httpx.Response(200, json=mock_response)
+        )
+
+        with patch.dict(os.environ, {"GITHUB_TOKEN": "test_token"}):
+            result = await make_github_request("GET", "/user")
+
+        assert result == mock_response
+        assert route.calls.last.request.headers["Authorization"] == "token test_token"
+        assert route.calls.last.request.headers["User-Agent"] == "website-generator-mcp/1.0.0"
+
+    @respx.mock
+    async def test_make_github_request_http_error(self):
+        """Test that an error status from GitHub is reported as None."""
+        respx.post("https://api.github.com/user/repos").mock(
+            return_value=httpx.Response(422, json={"message": "name already exists"})
+        )
+
+        with patch.dict(os.environ, {"GITHUB_TOKEN": "test_token"}):
+            result = await make_github_request("POST", "/user/repos", payload={})
+
+        assert result is None
+
+    @respx.mock
+    async def test_make_github_request_invalid_json(self):
+        """Test that a response body that isn't JSON is reported as None."""
+        respx.get("https://api.github.com/user").mock(
+            return_value=httpx.Response(200, content=b"<html>Unicorn!</html>")
+        )
+
         with patch.dict(os.environ, {"GITHUB_TOKEN": "test_token"}):
-            with patch("httpx.AsyncClient") as mock_client:
-                mock_response_obj = MagicMock()
-                mock_response_obj.json.return_value = mock_response
-                mock_response_obj.raise_for_status.return_value = None
-                
-                mock_client.return_value.__aenter__.return_value.get.return_value = mock_response_obj
-                
-                result = await make_github_request("GET", "/user")
-                assert result == mock_response
+            result = await make_github_request("GET", "/user")
+
+        assert result is None
+
+    @respx.mock
+    async def test_make_github_request_retries_server_errors(self, monkeypatch):
+        """Test that 502/503 responses are retried with exponential backoff."""
+        sleep = AsyncMock()
+        monkeypatch.setattr("utils.github_api.asyncio.sleep", sleep)
+        route = respx.post("https://api.github.com/user/repos").mock(
+            side_effect=[
+                httpx.Response(502),
+                httpx.Response(503),
+                httpx.Response(201, json={"clone_url": "https://github.com/user/test-project.git"}),
+            ]
+        )
+
+        with patch.dict(os.environ, {"GITHUB_TOKEN": "test_token"}):
+            result = await make_github_request("POST", "/user/repos", payload={})
+
+        assert result == {"clone_url": "https://github.com/user/test-project.git"}
+        assert route.call_count == 3
+        assert [call.args[0] for call in sleep.await_args_list] == [1.0, 2.0]
+
+    @respx.mock
+    async def test_make_github_request_respects_retry_after(self, monkeypatch):
+        """Test that a rate limit waits for Retry-After and gives up after MAX_RETRIES."""
+        sleep = AsyncMock()
+        monkeypatch.setattr("utils.github_api.asyncio.sleep", sleep)
+        route = respx.get("https://api.github.com/user").mock(
+            return_value=httpx.Response(403, headers={"Retry-After": "7"})
+        )
+
+        with patch.dict(os.environ, {"GITHUB_TOKEN": "test_token"}):
+            result = await make_github_request("GET", "/user")
+
+        assert result is None
+        assert route.call_count == MAX_RETRIES + 1
+        assert [call.args[0] for call in sleep.await_args_list] == [7.0] * MAX_RETRIES
+
+    @pytest.mark.parametrize("status, headers", [
+        (403, {}),
+        (422, {}),
+        (429, {"Retry-After": "3600"}),
+    ])
+    @respx.mock
+    async def test_make_github_request_no_retry(self, monkeypatch, status, headers):
+        """Test that client errors and long Retry-After delays are not retried."""
+        sleep = AsyncMock()
+        monkeypatch.setattr("utils.github_api.asyncio.sleep", sleep)
+        route = respx.get("https://api.github.com/user").mock(
+            return_value=httpx.Response(status, headers=headers)
+        )
+
+        with patch.dict(os.environ, {"GITHUB_TOKEN": "test_token"}):
+            result = await make_github_request("GET", "/user")
+
+        assert result is None
+        assert route.call_count == 1
+        sleep.assert_not_awaited()
+
+    async def test_http_client_is_reused_until_closed(self):
+        """Test that API calls share one client and closing it starts a new one."""
+        client = get_http_client()
+        assert get_http_client() is client
+
+        await close_http_client()
+        assert client.is_closed
+        new_client = get_http_client()
+        assert new_client is not client
+        await close_http_client()
     
-    def test_run_command_success(self):
+    @staticmethod
+    def _fake_process(returncode, stdout=b"", stderr=b""):
+        """Build a stand-in for the process returned by create_subprocess_exec."""
+        process = AsyncMock(returncode=returncode)
+        process.communicate.return_value = (stdout, stderr)
+        return process
+
+    async def test_run_command_success(self):
         """Test successful command execution."""
-        success, output = run_command(["echo", "test"])
+        process = self._fake_process(0, stdout=b"test\n")
+        with patch("asyncio.create_subprocess_exec", return_value=process):
+            success, output = await run_command(["echo", "test"])
+
         assert success is True
         assert "test" in output
+
+    @pytest.mark.slow
+    async def test_run_command_runs_real_process(self):
+        """Test that run_command really spawns the command and reads its output."""
+        success, output = await run_command(["echo", "test"])
+        assert success is True
+        assert output == "test\n"
     
-    def test_run_command_failure(self):
+    async def test_run_command_without_capture(self):
+        """Test that stdout is discarded when capture is disabled."""
+        success, output = await run_command(["echo", "test"], capture=False)
+        assert success is True
+        assert output == ""
+
+    @pytest.mark.slow
+    async def test_run_command_timeout_kills_command_ignoring_sigterm(self):
+        """Test that a timed out command ignoring SIGTERM is killed after the grace period."""
+        with patch("utils.git_operations.CLONE_TIMEOUT", 0.1), \
+                patch("utils.git_operations.TERMINATE_GRACE_PERIOD", 0.1):
+            success, output = await run_command(
+                ["/bin/bash", "-c", "trap '' TERM; sleep 5"]
+            )
+
+        assert success is False
+        assert "timed out" in output
+
+    async def test_run_command_is_posix_spawn_eligible(self):
+        """Test that commands are launched in a way subprocess can posix_spawn."""
+        real_exec = asyncio.create_subprocess_exec
+        with patch("asyncio.create_subprocess_exec", side_effect=real_exec) as mock_exec:
+            success, _ = await run_command(["echo", "test"])
+
+        assert success is True
+        args, kwargs = mock_exec.call_args
+        assert os.path.isabs(args[0])
+        assert kwargs["close_fds"] is False
+        assert kwargs["cwd"] is None
+        assert "preexec_fn" not in kwargs and "pass_fds" not in kwargs
+
+    async def test_run_command_failure(self):
         """Test failed command execution."""
-        success, output = run_command(["nonexistent_command"])
+        process = self._fake_process(1, stderr=b"fatal: not a git repository")
+        with patch("asyncio.create_subprocess_exec", return_value=process):
+            success, output = await run_command(["git", "status"])
+
+        assert success is False
+        assert output == "fatal: not a git repository"
+
+    async def test_run_command_missing_executable(self):
+        """Test that a command that cannot be launched is reported as a failure."""
+        with patch("asyncio.create_subprocess_exec", side_effect=FileNotFoundError("nonexistent_command")):
+            success, output = await run_command(["nonexistent_command"])
+
+        assert success is False
+        assert "nonexistent_command" in output
+
+    @pytest.mark.slow
+    async def test_run_command_timeout(self):
+        """Test that a command exceeding the timeout is killed."""
+        with patch("utils.git_operations.CLONE_TIMEOUT", 0.1):
+            success, output = await run_command(["sleep", "5"])
+
+        assert success is False
+        assert "timed out" in output
+
+    async def test_run_steps_reports_failed_step(self):
+        """Test that a batched script reports the step that failed."""
+        success, output = await run_steps([
+            ("First step failed", "true"),
+            ("Second step failed", "echo boom >&2 && false"),
+            ("Third step failed", "true"),
+        ])
         assert success is False
-        assert output  # Should contain error message
+        assert output.startswith("Second step failed")
+        assert "boom" in output
     
-    @pytest.mark.asyncio
+    async def test_run_command_custom_timeout(self):
+        """Test that an explicit timeout overrides CLONE_TIMEOUT."""
+        success, output = await run_command(["sleep", "5"], timeout=0.1)
+
+        assert (success, output) == (False, "Command timed out after 0.1 seconds")
+
+    async def test_push_and_commit_scripts_use_script_timeout(self, tmp_path, monkeypatch):
+        """Test that the batched push and commit scripts get SCRIPT_TIMEOUT, not CLONE_TIMEOUT."""
+        monkeypatch.setenv("GITHUB_TOKEN", "test_token")
+        monkeypatch.setattr("utils.git_operations.load_pygit2", lambda: None)
+        with patch("utils.git_operations.run_command", return_value=(True, "")) as mock_run:
+            await push_to_github(str(tmp_path), "https://github.com/user/test-project.git", "test-project")
+            await commit_and_push_changes(str(tmp_path), "Update")
+
+        assert [call.kwargs["timeout"] for call in mock_run.call_args_list] == [SCRIPT_TIMEOUT] * 2
+        assert SCRIPT_TIMEOUT > CLONE_TIMEOUT
+
+    @staticmethod
+    async def _wait_until_gone(pid, timeout=2.0):
+        """Return True once a process has exited (zombies count as exited)."""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while loop.time() < deadline:
+            try:
+                with open(f"/proc/{pid}/stat") as f:
+                    if f.read().rsplit(")", 1)[1].split()[0] == "Z":
+                        return True
+            except FileNotFoundError:
+                return True
+            await asyncio.sleep(0.05)
+        return False
+
+    @pytest.mark.slow
+    async def test_run_shell_timeout_stops_started_commands(self, tmp_path):
+        """Test that a timed out script takes the commands it started down with it."""
+        pid_file = tmp_path / "pid"
+
+        success, output = await run_shell(f"sleep 30 & echo $! > {pid_file}; wait", timeout=0.2)
+
+        assert (success, output) == (False, "Command timed out after 0.2 seconds")
+        assert await self._wait_until_gone(int(pid_file.read_text()))
+
+    async def test_run_command_cancelled_after_process_exited(self):
+        """Test that cancellation still propagates when the process is already gone."""
+        process = self._fake_process(0)
+
+        async def hang(*args):
+            await asyncio.sleep(10)
+
+        process.communicate.side_effect = hang
+        process.terminate = MagicMock(side_effect=ProcessLookupError)
+        with patch("asyncio.create_subprocess_exec", return_value=process):
+            task = asyncio.create_task(run_command(["sleep", "10"]))
+            await asyncio.sleep(0.01)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+
+    async def test_run_steps_timeout_blames_no_step(self):
+        """Test that a timeout, which carries no step marker, isn't blamed on the first step."""
+        with patch("utils.git_operations.CLONE_TIMEOUT", 0.1):
+            success, output = await run_steps([
+                ("First step failed", "true"),
+                ("Second step failed", "sleep 5"),
+            ])
+
+        assert (success, output) == (False, "Command timed out after 0.1 seconds")
+
     async def test_create_github_repository_success(self):
         """Test successful GitHub repository creation."""
         mock_response = {
@@ -70,7 +357,6 @@ class TestWebsiteGeneratorMCP:
             assert success is True
             assert repo_url == "https://github.com/user/test-project.git"
     
-    @pytest.mark.asyncio
     async def test_create_github_repository_failure(self):
         """Test failed GitHub repository creation."""
         with patch("utils.github_api.make_github_request", return_value=None):
@@ -79,303 +365,694 @@ class TestWebsiteGeneratorMCP:
             assert success is False
             assert "Failed to create GitHub repository" in message
     
-    @pytest.mark.asyncio
-    async def test_push_to_github_success(self):
+    @staticmethod
+    async def _make_template_repo(template_path):
+        """Create a local git repository usable as a template."""
+        os.makedirs(template_path)
+        with open(os.path.join(template_path, "index.html"), "w") as f:
+            f.write("<html></html>")
+        success, output = await run_steps([
+            ("init failed", "git init -q"),
+            ("add failed", "git add ."),
+            ("commit failed", "git -c user.name=t -c user.email=t@t commit -q -m init"),
+        ], cwd=template_path)
+        assert success, output
+
+    async def test_clone_template_to_base_directory_removes_git_folder(self, tmp_path):
+        """Test that the cloned template has no .git folder and leaves no leftovers."""
+        template_path = str(tmp_path / "template")
+        base_dir = str(tmp_path / "base")
+        cache_dir = str(tmp_path / "cache")
+        os.makedirs(base_dir)
+        await self._make_template_repo(template_path)
+
+        with patch("utils.git_operations.TEMPLATE_CACHE_DIR", cache_dir):
+            success, project_path = await clone_template_to_base_directory(
+                "test-project", base_dir, f"file://{template_path}"
+            )
+        await wait_for_background_removals()
+
+        assert success is True
+        assert os.path.exists(os.path.join(project_path, "index.html"))
+        assert not os.path.exists(os.path.join(project_path, ".git"))
+        assert os.listdir(base_dir) == ["test-project"]
+        assert len(os.listdir(cache_dir)) == 1
+
+    async def test_clone_template_to_base_directory_replaces_existing_project(self, tmp_path):
+        """Test that an existing project directory is replaced by a fresh copy."""
+        template_path = str(tmp_path / "template")
+        base_dir = tmp_path / "base"
+        (base_dir / "test-project").mkdir(parents=True)
+        (base_dir / "test-project" / "stale.txt").write_text("stale")
+        await self._make_template_repo(template_path)
+
+        with patch("utils.git_operations.TEMPLATE_CACHE_DIR", str(tmp_path / "cache")):
+            success, project_path = await clone_template_to_base_directory(
+                "test-project", str(base_dir), f"file://{template_path}"
+            )
+        await wait_for_background_removals()
+
+        assert success is True
+        assert sorted(os.listdir(project_path)) == ["index.html"]
+        assert os.listdir(base_dir) == ["test-project"]
+
+    async def test_clone_template_to_base_directory_uses_cache(self, tmp_path):
+        """Test that a second setup copies the cached template instead of cloning."""
+        temp_dir = str(tmp_path)
+        template_path = os.path.join(temp_dir, "template")
+        cache_dir = os.path.join(temp_dir, "cache")
+        await self._make_template_repo(template_path)
+        template_repo = f"file://{template_path}"
+
+        with patch("utils.git_operations.TEMPLATE_CACHE_DIR", cache_dir):
+            success, _ = await clone_template_to_base_directory(
+                "first-project", temp_dir, template_repo
+            )
+            assert success is True
+            await wait_for_background_removals()
+
+            with patch("utils.git_operations.run_command") as mock_run:
+                success, project_path = await clone_template_to_base_directory(
+                    "second-project", temp_dir, template_repo
+                )
+
+        assert success is True
+        mock_run.assert_not_called()
+        assert os.path.exists(os.path.join(project_path, "index.html"))
+
+    async def test_template_cache_refresh_keeps_version_being_copied(self, tmp_path, monkeypatch):
+        """Test that a refresh doesn't remove the cache version an in-flight copy reads."""
+        template_path = str(tmp_path / "template")
+        cache_dir = str(tmp_path / "cache")
+        await self._make_template_repo(template_path)
+        template_repo = f"file://{template_path}"
+        monkeypatch.setattr("utils.git_operations.TEMPLATE_CACHE_DIR", cache_dir)
+
+        async with cached_template(template_repo) as (success, old_version):
+            assert success is True
+            # Expire the cache while the first copy is still reading it
+            monkeypatch.setattr("utils.git_operations.TEMPLATE_CACHE_TTL", 0)
+            async with cached_template(template_repo) as (success, new_version):
+                assert success is True
+            await wait_for_background_removals()
+
+            assert new_version != old_version
+            assert os.path.exists(os.path.join(old_version, "index.html"))
+            assert os.path.exists(os.path.join(new_version, "index.html"))
+
+        await wait_for_background_removals()
+        assert not os.path.exists(old_version)
+        assert os.listdir(cache_dir) == [os.path.basename(new_version)]
+
+    @pytest.mark.parametrize("rm_path", [None, "rm"], ids=["rm", "shutil-fallback"])
+    async def test_remove_tree(self, tmp_path, monkeypatch, rm_path):
+        """Test that a directory tree is deleted with rm -rf or the shutil fallback."""
+        if rm_path is not None:
+            monkeypatch.setattr("utils.git_operations.resolve_executable", lambda name: rm_path)
+        tree = tmp_path / "tree"
+        (tree / "nested" / "deeper").mkdir(parents=True)
+        (tree / "nested" / "deeper" / "file.txt").write_text("content")
+
+        assert await remove_tree(str(tree)) == (True, "")
+        assert not tree.exists()
+        assert await remove_tree(str(tree)) == (True, "")
+
+    @pytest.mark.parametrize("repo_url", [
+        "git@github.com:user/test-project.git",
+        "https://gitlab.com/user/test-project.git",
+        "https://github.com/",
+        "https://github.com/user",
+        "https://github.com//test-project.git",
+    ])
+    async def test_push_to_github_rejects_unsupported_url(self, tmp_path, monkeypatch, repo_url):
+        """Test that only https://github.com/<owner>/<repo> URLs are pushed to."""
+        monkeypatch.setenv("GITHUB_TOKEN", "test_token")
+        with patch("utils.git_operations.run_steps") as mock_run:
+            success, message = await push_to_github(str(tmp_path), repo_url, "test-project")
+
+        assert (success, message) == (False, f"Unsupported repository URL format: {repo_url}")
+        mock_run.assert_not_called()
+
+    async def test_push_to_github_success(self, tmp_path):
         """Test successful push to GitHub."""
-        with tempfile.TemporaryDirectory() as temp_dir:
-            project_path = os.path.join(temp_dir, "test-project")
-            os.makedirs(project_path)
-            
-            with patch.dict(os.environ, {"GITHUB_TOKEN": "test_token"}):
-                with patch("utils.git_operations.run_command") as mock_run:
-                    mock_run.return_value = (True, "Success")
-                    
-                    success, message = await push_to_github(
-                        project_path,
-                        "https://github.com/user/test-project.git",
-                        "test-project"
-                    )
-                    
-                    assert success is True
-                    assert "Successfully pushed to GitHub" in message
-    
-    @pytest.mark.asyncio
-    async def test_push_to_github_failure(self):
+        project_path = str(tmp_path / "test-project")
+        os.makedirs(project_path)
+
+        with patch.dict(os.environ, {"GITHUB_TOKEN": "test_token"}), \
+                patch("utils.git_operations.load_pygit2", return_value=None):
+            with patch("utils.git_operations.run_command") as mock_run:
+                mock_run.return_value = (True, "Success")
+
+                success, message = await push_to_github(
+                    project_path,
+                    "https://github.com/user/test-project.git",
+                    "test-project"
+                )
+
+                assert success is True
+                assert "Successfully pushed to GitHub" in message
+
+    async def test_push_to_github_failure(self, tmp_path):
         """Test failed push to GitHub."""
-        with tempfile.TemporaryDirectory() as temp_dir:
-            project_path = os.path.join(temp_dir, "test-project")
-            os.makedirs(project_path)
-            
-            with patch.dict(os.environ, {"GITHUB_TOKEN": "test_token"}):
-                with patch("utils.git_operations.run_command") as mock_run:
-                    mock_run.return_value = (False, "Git command failed")
-                    
-                    success, message = await push_to_github(
-                        project_path,
-                        "https://github.com/user/test-project.git",
-                        "test-project"
-                    )
-                    
-                    assert success is False
-                    assert "Failed to initialize git repository" in message
-    
-    @pytest.mark.asyncio
-    async def test_push_to_github_without_token(self):
-        """Test push to GitHub fails without token."""
-        with tempfile.TemporaryDirectory() as temp_dir:
-            project_path = os.path.join(temp_dir, "test-project")
-            os.makedirs(project_path)
-            
-            with patch.dict(os.environ, {}, clear=True):
+        project_path = str(tmp_path / "test-project")
+        os.makedirs(project_path)
+
+        with patch.dict(os.environ, {"GITHUB_TOKEN": "test_token"}), \
+                patch("utils.git_operations.load_pygit2", return_value=None):
+            with patch("utils.git_operations.run_command") as mock_run:
+                mock_run.return_value = (False, "::step=0\nGit command failed")
+
                 success, message = await push_to_github(
                     project_path,
                     "https://github.com/user/test-project.git",
                     "test-project"
                 )
-                
+
                 assert success is False
-                assert "GitHub token is required" in message
-    
-    @pytest.mark.asyncio
+                assert message == "Failed to initialize git repository: Git command failed"
+
+    @staticmethod
+    async def _make_local_remote(remote_path, monkeypatch):
+        """Create a bare repository and route pushes for the test GitHub URL to it."""
+        success, output = await run_command(["git", "init", "-q", "--bare", remote_path])
+        assert success, output
+        monkeypatch.setattr(
+            "utils.git_operations.github_auth_env",
+            lambda token: {
+                **os.environ,
+                "GIT_CONFIG_COUNT": "1",
+                "GIT_CONFIG_KEY_0": f"url.file://{remote_path}.insteadOf",
+                "GIT_CONFIG_VALUE_0": "https://github.com/user/test-project.git",
+            },
+        )
+
+    async def test_push_to_github_commits_to_main(self, tmp_path, monkeypatch):
+        """Test that the git CLI setup script commits to main and pushes it."""
+        project_path = str(tmp_path / "test-project")
+        remote_path = str(tmp_path / "remote.git")
+        os.makedirs(project_path)
+        with open(os.path.join(project_path, "index.html"), "w") as f:
+            f.write("<html></html>")
+        await self._make_local_remote(remote_path, monkeypatch)
+
+        with patch.dict(os.environ, {"GITHUB_TOKEN": "test_token"}), \
+                patch("utils.git_operations.load_pygit2", return_value=None):
+            success, message = await push_to_github(
+                project_path,
+                "https://github.com/user/test-project.git",
+                "test-project"
+            )
+
+        assert success is True, message
+        _, log = await run_command(["git", "-C", project_path, "log", "--format=%s %D"])
+        assert log.strip() == "Initial commit for test-project HEAD -> main, origin/main"
+        _, files = await run_command(["git", "-C", remote_path, "ls-tree", "--name-only", "main"])
+        assert files.split() == ["index.html"]
+
+    async def test_push_to_github_waits_for_background_add_on_failure(self, tmp_path, monkeypatch):
+        """Test that a failing step doesn't leave the background 'git add' running."""
+        project_path = str(tmp_path / "test-project")
+        success, output = await run_command(["git", "init", "-q", project_path])
+        assert success, output
+        with open(os.path.join(project_path, "index.html"), "w") as f:
+            f.write("<html></html>")
+        # An existing origin makes "remote add" fail, and a slow fsmonitor
+        # hook keeps "git add" (and its index lock) busy past that point
+        hook = tmp_path / "slow-fsmonitor"
+        hook.write_text("#!/bin/sh\nsleep 0.5\n")
+        hook.chmod(0o755)
+        for args in (["remote", "add", "origin", "https://example.com/repo.git"],
+                     ["config", "core.fsmonitor", str(hook)]):
+            success, output = await run_command(["git", "-C", project_path, *args])
+            assert success, output
+        monkeypatch.setenv("GITHUB_TOKEN", "test_token")
+        monkeypatch.setattr("utils.git_operations.load_pygit2", lambda: None)
+
+        success, message = await push_to_github(
+            project_path, "https://github.com/user/test-project.git", "test-project"
+        )
+
+        assert success is False
+        assert message.startswith("Failed to add remote origin:")
+        assert not os.path.exists(os.path.join(project_path, ".git", "index.lock"))
+
+    @pytest.mark.slow
+    async def test_push_to_github_timeout_stops_background_add(self, tmp_path, monkeypatch):
+        """Test that a script timing out while 'git add' runs doesn't leave the add behind."""
+        project_path = str(tmp_path / "test-project")
+        success, output = await run_command(["git", "init", "-q", project_path])
+        assert success, output
+        with open(os.path.join(project_path, "index.html"), "w") as f:
+            f.write("<html></html>")
+        # A slow fsmonitor hook keeps "git add" busy past the timeout
+        hook = tmp_path / "slow-fsmonitor"
+        hook.write_text("#!/bin/sh\nsleep 30\n")
+        hook.chmod(0o755)
+        success, output = await run_command(["git", "-C", project_path, "config", "core.fsmonitor", str(hook)])
+        assert success, output
+        monkeypatch.setenv("GITHUB_TOKEN", "test_token")
+        monkeypatch.setattr("utils.git_operations.load_pygit2", lambda: None)
+        monkeypatch.setattr("utils.git_operations.SCRIPT_TIMEOUT", 0.5)
+
+        success, message = await push_to_github(
+            project_path, "https://github.com/user/test-project.git", "test-project"
+        )
+
+        assert (success, message) == (False, "Command timed out after 0.5 seconds")
+        _, running = await run_command(["pgrep", "-f", f"{project_path} add"])
+        assert running == ""
+        assert not os.path.exists(os.path.join(project_path, ".git", "index.lock"))
+
+    async def test_push_to_github_reports_background_add_failure(self, tmp_path, monkeypatch):
+        """Test that a failing 'git add', which runs in the background, is reported as such."""
+        project_path = str(tmp_path / "test-project")
+        success, output = await run_command(["git", "init", "-q", project_path])
+        assert success, output
+        with open(os.path.join(project_path, "index.html"), "w") as f:
+            f.write("<html></html>")
+        # A stale index lock makes "git add" fail
+        open(os.path.join(project_path, ".git", "index.lock"), "w").close()
+        monkeypatch.setenv("GITHUB_TOKEN", "test_token")
+        monkeypatch.setattr("utils.git_operations.load_pygit2", lambda: None)
+
+        success, message = await push_to_github(
+            project_path, "https://github.com/user/test-project.git", "test-project"
+        )
+
+        assert success is False
+        assert message.startswith("Failed to add files to git:")
+        assert "index.lock" in message
+
+    async def test_push_to_github_keeps_token_out_of_remote_url(self, tmp_path):
+        """Test that the token is sent as a header instead of being stored in the remote URL."""
+        temp_dir = str(tmp_path)
+        with patch.dict(os.environ, {"GITHUB_TOKEN": "test_token"}), \
+                patch("utils.git_operations.load_pygit2", return_value=None):
+            with patch("utils.git_operations.run_command") as mock_run:
+                mock_run.return_value = (True, "")
+
+                success, _ = await push_to_github(
+                    temp_dir,
+                    "https://github.com/user/test-project.git",
+                    "test-project"
+                )
+
+        assert success is True
+        mock_run.assert_called_once()
+        script = mock_run.call_args.args[0][-1]
+        assert "test_token" not in script
+        assert "remote add origin https://github.com/user/test-project.git" in script
+        push_env = mock_run.call_args.kwargs["env"]
+        assert push_env["GIT_CONFIG_KEY_0"] == "http.https://github.com/.extraheader"
+        assert push_env["GIT_CONFIG_VALUE_0"].startswith("AUTHORIZATION: basic ")
+
+    async def test_push_to_github_with_pygit2(self, tmp_path):
+        """Test that the in-process pygit2 backend commits and pushes main."""
+        pygit2 = pytest.importorskip("pygit2")
+
+        project_path = str(tmp_path / "test-project")
+        os.makedirs(project_path)
+        with open(os.path.join(project_path, "index.html"), "w") as f:
+            f.write("<html></html>")
+
+        with patch.dict(os.environ, {"GITHUB_TOKEN": "test_token"}):
+            with patch.object(pygit2.Remote, "push") as mock_push:
+                success, message = await push_to_github(
+                    project_path,
+                    "https://github.com/user/test-project.git",
+                    "test-project"
+                )
+
+        assert success is True
+        assert "Successfully pushed to GitHub" in message
+        mock_push.assert_called_once()
+
+        repo = pygit2.Repository(project_path)
+        assert repo.head.shorthand == "main"
+        assert repo.head.peel().message == "Initial commit for test-project"
+        assert "index.html" in repo.head.peel().tree
+
+    async def test_push_to_github_with_pygit2_reports_rejected_ref(self, tmp_path):
+        """Test that a ref rejected by the server fails the pygit2 push."""
+        pygit2 = pytest.importorskip("pygit2")
+
+        project_path = str(tmp_path / "test-project")
+        os.makedirs(project_path)
+        with open(os.path.join(project_path, "index.html"), "w") as f:
+            f.write("<html></html>")
+
+        # Like libgit2, return normally and only report the rejection
+        # through the callback
+        def reject(self, specs, callbacks=None):
+            callbacks.push_update_reference("refs/heads/main", "pre-receive hook declined")
+
+        with patch.dict(os.environ, {"GITHUB_TOKEN": "test_token"}):
+            with patch.object(pygit2.Remote, "push", reject):
+                success, message = await push_to_github(
+                    project_path,
+                    "https://github.com/user/test-project.git",
+                    "test-project"
+                )
+
+        assert (success, message) == (
+            False,
+            "Failed to push to GitHub: refs/heads/main rejected: pre-receive hook declined",
+        )
+
+    @pytest.mark.parametrize("backend, pygit2_installed, expected", [
+        ("cli", True, "Successfully pushed to GitHub"),
+        ("auto", True, "pushed with pygit2"),
+        ("auto", False, "Successfully pushed to GitHub"),
+    ])
+    async def test_push_to_github_backend_selection(self, tmp_path, monkeypatch, backend, pygit2_installed, expected):
+        """Test that GIT_BACKEND picks between the pygit2 and git CLI backends."""
+        monkeypatch.setenv("GITHUB_TOKEN", "test_token")
+        monkeypatch.setenv("GIT_BACKEND", backend)
+        monkeypatch.setattr("utils.git_operations.load_pygit2", lambda: object() if pygit2_installed else None)
+        monkeypatch.setattr("utils.git_operations.push_with_pygit2", lambda *args: (True, "pushed with pygit2"))
+        monkeypatch.setattr("utils.git_operations.run_command", AsyncMock(return_value=(True, "")))
+
+        success, message = await push_to_github(
+            str(tmp_path), "https://github.com/user/test-project.git", "test-project"
+        )
+
+        assert (success, message) == (True, expected)
+
+    async def test_push_to_github_requires_requested_pygit2(self, tmp_path, monkeypatch):
+        """Test that forcing the pygit2 backend without pygit2 installed fails clearly."""
+        monkeypatch.setenv("GITHUB_TOKEN", "test_token")
+        monkeypatch.setenv("GIT_BACKEND", "pygit2")
+        monkeypatch.setattr("utils.git_operations.load_pygit2", lambda: None)
+
+        success, message = await push_to_github(
+            str(tmp_path), "https://github.com/user/test-project.git", "test-project"
+        )
+
+        assert success is False
+        assert "pygit2 is not installed" in message
+
+    async def test_push_to_github_without_token(self, tmp_path):
+        """Test push to GitHub fails without token."""
+        project_path = str(tmp_path / "test-project")
+        os.makedirs(project_path)
+
+        with patch.dict(os.environ, {}, clear=True):
+            success, message = await push_to_github(
+                project_path,
+                "https://github.com/user/test-project.git",
+                "test-project"
+            )
+
+            assert success is False
+            assert "GitHub token is required" in message
+
     async def test_repo_setup_without_github_token(self):
         """Test repo_setup fails without GitHub token."""
         with patch.dict(os.environ, {}, clear=True):
             result = await repo_setup("test-project")
             assert "GitHub Token is missing" in result
     
-    @pytest.mark.asyncio
-    async def test_repo_setup_empty_project_name(self):
+    @pytest.mark.parametrize("project_name", ["", "   "])
+    async def test_repo_setup_empty_project_name(self, project_name):
         """Test repo_setup fails with empty project name."""
         with patch.dict(os.environ, {"GITHUB_TOKEN": "test_token"}):
-            result = await repo_setup("")
-            assert "Project name is required" in result
-            
-            result = await repo_setup("   ")
+            result = await repo_setup(project_name)
             assert "Project name is required" in result
     
-    @pytest.mark.asyncio
-    async def test_repo_setup_success(self):
+    async def test_repo_setup_success(self, mocked_pipeline):
         """Test successful complete repo setup."""
-        with patch.dict(os.environ, {"GITHUB_TOKEN": "test_token"}):
-            with patch("main.clone_template_to_base_directory") as mock_clone:
-                with patch("main.create_github_repository") as mock_create:
-                    with patch("main.push_to_github") as mock_push:
-                        
-                        mock_clone.return_value = (True, "./test-project")
-                        mock_create.return_value = (True, "https://github.com/user/test-project.git")
-                        mock_push.return_value = (True, "Successfully pushed to GitHub")
-                        
-                        result = await repo_setup("Test Project", "A test project")
-                        
-                        assert "Repository setup completed successfully!" in result
-                        assert "test-project" in result
-                        assert "https://github.com/user/test-project" in result
-                        assert "✅ Cloned React Vite template repository to base directory" in result
-                        assert "✅ Created new GitHub repository" in result
-                        assert "✅ Pushed code to GitHub repository" in result
+        result = await repo_setup("Test Project", "A test project")
+
+        assert "Repository setup completed successfully!" in result
+        assert "test-project" in result
+        assert "https://github.com/user/test-project" in result
+        assert "✅ Cloned React Vite template repository to base directory" in result
+        assert "✅ Created new GitHub repository" in result
+        assert "✅ Pushed code to GitHub repository" in result
     
-    @pytest.mark.asyncio
-    async def test_repo_setup_with_amplify_deployment(self):
+    async def test_repo_setup_with_amplify_deployment(self, mocked_pipeline):
         """Test repo setup with Amplify deployment option."""
-        with patch.dict(os.environ, {"GITHUB_TOKEN": "test_token"}):
-            with patch("main.clone_template_to_base_directory") as mock_clone:
-                with patch("main.create_github_repository") as mock_create:
-                    with patch("main.push_to_github") as mock_push:
-                        
-                        mock_clone.return_value = (True, "./test-project")
-                        mock_create.return_value = (True, "https://github.com/user/test-project.git")
-                        mock_push.return_value = (True, "Successfully pushed to GitHub")
-                        
-                        result = await repo_setup("test-project", deploy_to_amplify=True)
-                        
-                        assert "Repository setup completed successfully!" in result
-                        assert "AWS Amplify deployment is not yet implemented" in result
+        result = await repo_setup("test-project", deploy_to_amplify=True)
+
+        assert "Repository setup completed successfully!" in result
+        assert "AWS Amplify deployment is not yet implemented" in result
     
-    @pytest.mark.asyncio
-    async def test_repo_setup_clone_failure(self):
+    async def test_repo_setup_clones_while_creating_repository(self, mocked_pipeline):
+        """Test that template cloning and GitHub repo creation overlap."""
+        events = []
+
+        async def fake_clone(*args):
+            events.append("clone started")
+            await asyncio.sleep(0)
+            events.append("clone finished")
+            return True, "./test-project"
+
+        async def fake_create(*args):
+            events.append("create started")
+            await asyncio.sleep(0)
+            events.append("create finished")
+            return True, "https://github.com/user/test-project.git"
+
+        mocked_pipeline.clone.side_effect = fake_clone
+        mocked_pipeline.create.side_effect = fake_create
+
+        result = await repo_setup("test-project")
+
+        assert "Repository setup completed successfully!" in result
+        assert events.index("create started") < events.index("clone finished")
+
+    async def test_repo_setup_clone_failure(self, mocked_pipeline):
         """Test repo setup fails at clone step."""
-        with patch.dict(os.environ, {"GITHUB_TOKEN": "test_token"}):
-            with patch("main.clone_template_to_base_directory") as mock_clone:
-                mock_clone.return_value = (False, "Clone failed")
-                
-                result = await repo_setup("test-project")
-                
-                assert "Failed at Step 1: Clone failed" in result
+        mocked_pipeline.clone.return_value = (False, "Clone failed")
+
+        result = await repo_setup("test-project")
+
+        assert "Failed at Step 1: Clone failed" in result
+        mocked_pipeline.push.assert_not_called()
     
-    @pytest.mark.asyncio
-    async def test_repo_setup_create_repo_failure(self):
+    async def test_repo_setup_create_repo_failure(self, mocked_pipeline):
         """Test repo setup fails at GitHub repo creation step."""
-        with patch.dict(os.environ, {"GITHUB_TOKEN": "test_token"}):
-            with patch("main.clone_template_to_base_directory") as mock_clone:
-                with patch("main.create_github_repository") as mock_create:
-                    
-                    mock_clone.return_value = (True, "./test-project")
-                    mock_create.return_value = (False, "Repo creation failed")
-                    
-                    result = await repo_setup("test-project")
-                    
-                    assert "Failed at Step 2: Repo creation failed" in result
+        mocked_pipeline.create.return_value = (False, "Repo creation failed")
+
+        result = await repo_setup("test-project")
+
+        assert "Failed at Step 2: Repo creation failed" in result
+        mocked_pipeline.push.assert_not_called()
     
-    @pytest.mark.asyncio
-    async def test_repo_setup_push_failure(self):
+    async def test_repo_setup_create_repo_failure_cancels_clone(self, mocked_pipeline):
+        """Test that a fast Step 2 failure doesn't wait for the clone to finish."""
+        clone_cancelled = asyncio.Event()
+
+        async def slow_clone(*args):
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                clone_cancelled.set()
+                raise
+            return True, "./test-project"
+
+        mocked_pipeline.clone.side_effect = slow_clone
+        mocked_pipeline.create.return_value = (False, "name already exists")
+
+        result = await asyncio.wait_for(repo_setup("test-project"), timeout=1)
+
+        assert result == "Failed at Step 2: name already exists"
+        assert clone_cancelled.is_set()
+        mocked_pipeline.push.assert_not_called()
+
+    async def test_repo_setup_clone_failure_retrieves_create_error(self, mocked_pipeline):
+        """Test that a Step 2 exception is retrieved when Step 1 fails first."""
+        mocked_pipeline.clone.return_value = (False, "Clone failed")
+
+        async def failing_create(*args):
+            await asyncio.sleep(0)
+            raise RuntimeError("boom")
+
+        mocked_pipeline.create.side_effect = failing_create
+        loop = asyncio.get_running_loop()
+        with patch.object(loop, "call_exception_handler") as exception_handler:
+            result = await repo_setup("test-project")
+            await asyncio.sleep(0)
+
+        assert result == "Failed at Step 1: Clone failed"
+        exception_handler.assert_not_called()
+
+    async def test_run_command_stops_process_when_cancelled(self):
+        """Test that cancelling run_command terminates the running command."""
+        process = self._fake_process(0)
+
+        async def hang(*args):
+            await asyncio.sleep(10)
+
+        process.communicate.side_effect = hang
+        process.terminate = MagicMock()
+        with patch("asyncio.create_subprocess_exec", return_value=process):
+            task = asyncio.create_task(run_command(["sleep", "10"]))
+            await asyncio.sleep(0.01)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+
+        process.terminate.assert_called_once()
+
+    async def test_repo_setup_push_failure(self, mocked_pipeline):
         """Test repo setup fails at push step."""
-        with patch.dict(os.environ, {"GITHUB_TOKEN": "test_token"}):
-            with patch("main.clone_template_to_base_directory") as mock_clone:
-                with patch("main.create_github_repository") as mock_create:
-                    with patch("main.push_to_github") as mock_push:
-                        
-                        mock_clone.return_value = (True, "./test-project")
-                        mock_create.return_value = (True, "https://github.com/user/test-project.git")
-                        mock_push.return_value = (False, "Push failed")
-                        
-                        result = await repo_setup("test-project")
-                        
-                        assert "Failed at Step 3: Push failed" in result
+        mocked_pipeline.push.return_value = (False, "Push failed")
+
+        result = await repo_setup("test-project")
+
+        assert "Failed at Step 3: Push failed" in result
     
-    @pytest.mark.asyncio
-    async def test_repo_setup_unexpected_error(self):
+    async def test_repo_setup_unexpected_error(self, mocked_pipeline):
         """Test repo setup handles unexpected errors gracefully."""
-        with patch.dict(os.environ, {"GITHUB_TOKEN": "test_token"}):
-            with patch("main.clone_template_to_base_directory") as mock_clone:
-                mock_clone.side_effect = Exception("Unexpected error")
-                
-                result = await repo_setup("test-project")
-                
-                assert "Repository setup failed due to unexpected error" in result
-                assert "Unexpected error" in result
+        mocked_pipeline.clone.side_effect = Exception("Unexpected error")
+
+        result = await repo_setup("test-project")
+
+        assert "Repository setup failed due to unexpected error" in result
+        assert "Unexpected error" in result
     
-    @pytest.mark.asyncio
-    async def test_create_file_success(self):
+    async def test_create_file_success(self, monkeypatch):
         """Test successful file creation."""
-        with patch("main.create_file_in_project") as mock_create:
-            mock_create.return_value = (True, "File created successfully")
-            
-            result = await create_file("test.txt", "./src", "Hello World")
-            
-            assert "File created successfully!" in result
-            assert "test.txt" in result
-            assert "./src" in result
-            mock_create.assert_called_once_with("./src", "test.txt", "Hello World")
-    
-    @pytest.mark.asyncio
-    async def test_create_file_empty_filename(self):
-        """Test create_file fails with empty filename."""
-        result = await create_file("", "./src", "content")
-        assert "File name is required and cannot be empty" in result
+        mock_create = AsyncMock(return_value=(True, "File created successfully"))
+        monkeypatch.setattr("main.create_file_in_project", mock_create)
         
-        result = await create_file("   ", "./src", "content")
-        assert "File name is required and cannot be empty" in result
-    
-    @pytest.mark.asyncio
-    async def test_create_file_empty_filepath(self):
-        """Test create_file fails with empty filepath."""
-        result = await create_file("test.txt", "", "content")
-        assert "File path is required and cannot be empty" in result
+        result = await create_file("test.txt", "./src", "Hello World")
         
-        result = await create_file("test.txt", "   ", "content")
-        assert "File path is required and cannot be empty" in result
+        assert "File created successfully!" in result
+        assert "test.txt" in result
+        assert "./src" in result
+        mock_create.assert_called_once_with("./src", "test.txt", "Hello World")
+
+    @pytest.mark.parametrize("file_name, file_path, expected", [
+        ("", "./src", "File name is required and cannot be empty"),
+        ("   ", "./src", "File name is required and cannot be empty"),
+        ("test.txt", "", "File path is required and cannot be empty"),
+        ("test.txt", "   ", "File path is required and cannot be empty"),
+    ])
+    async def test_create_file_invalid_inputs(self, file_name, file_path, expected):
+        """Test create_file fails with an empty filename or filepath."""
+        result = await create_file(file_name, file_path, "content")
+        assert expected in result
     
-    @pytest.mark.asyncio
-    async def test_create_file_with_empty_content(self):
+    async def test_create_file_with_empty_content(self, monkeypatch):
         """Test create_file works with empty content."""
-        with patch("main.create_file_in_project") as mock_create:
-            mock_create.return_value = (True, "File created successfully")
-            
-            result = await create_file("test.txt", "./src", "")
-            
-            assert "File created successfully!" in result
-            mock_create.assert_called_once_with("./src", "test.txt", "")
-    
-    @pytest.mark.asyncio
-    async def test_create_file_failure(self):
+        mock_create = AsyncMock(return_value=(True, "File created successfully"))
+        monkeypatch.setattr("main.create_file_in_project", mock_create)
+        
+        result = await create_file("test.txt", "./src", "")
+        
+        assert "File created successfully!" in result
+        mock_create.assert_called_once_with("./src", "test.txt", "")
+
+    async def test_create_file_failure(self, monkeypatch):
         """Test create_file handles creation failure."""
-        with patch("main.create_file_in_project") as mock_create:
-            mock_create.return_value = (False, "Permission denied")
-            
-            result = await create_file("test.txt", "./src", "content")
-            
-            assert "Failed to create file: Permission denied" in result
-    
-    @pytest.mark.asyncio
-    async def test_create_file_unexpected_error(self):
+        mock_create = AsyncMock(return_value=(False, "Permission denied"))
+        monkeypatch.setattr("main.create_file_in_project", mock_create)
+        
+        result = await create_file("test.txt", "./src", "content")
+        
+        assert "Failed to create file: Permission denied" in result
+
+    async def test_create_file_unexpected_error(self, monkeypatch):
         """Test create_file handles unexpected errors."""
-        with patch("main.create_file_in_project") as mock_create:
-            mock_create.side_effect = Exception("Unexpected error")
-            
-            result = await create_file("test.txt", "./src", "content")
-            
-            assert "File creation failed due to unexpected error" in result
-            assert "Unexpected error" in result
-    
-    @pytest.mark.asyncio
-    async def test_push_changes_success(self):
+        monkeypatch.setattr("main.create_file_in_project", AsyncMock(side_effect=Exception("Unexpected error")))
+        
+        result = await create_file("test.txt", "./src", "content")
+        
+        assert "File creation failed due to unexpected error" in result
+        assert "Unexpected error" in result
+
+    async def test_create_files_success(self, tmp_path):
+        """Test that create_files writes every file in the batch."""
+        files = [
+            {"file_name": "index.html", "file_path": str(tmp_path), "content": "<html></html>"},
+            {"file_name": "App.jsx", "file_path": str(tmp_path / "src"), "content": "export default App;"},
+        ]
+
+        result = await create_files(files)
+
+        assert "Files created successfully!" in result
+        assert "Total Files: 2" in result
+        assert (tmp_path / "index.html").read_text() == "<html></html>"
+        assert (tmp_path / "src" / "App.jsx").read_text() == "export default App;"
+
+    @pytest.mark.parametrize("files, expected", [
+        ([], "At least one file is required."),
+        ([{"file_name": "", "file_path": "./src"}], "File 1: File name is required and cannot be empty."),
+        ([{"file_name": "a.txt", "file_path": "./src"}, {"file_name": "b.txt", "file_path": " "}],
+         "File 2: File path is required and cannot be empty."),
+    ])
+    async def test_create_files_invalid_inputs(self, files, expected):
+        """Test create_files rejects an empty batch or an entry without name/path."""
+        assert await create_files(files) == expected
+
+    async def test_create_files_in_project_reports_every_failure(self, tmp_path):
+        """Test that one failed file doesn't hide the others' results."""
+        (tmp_path / "blocker").write_text("not a directory")
+
+        success, message = await create_files_in_project([
+            (str(tmp_path), "ok.txt", "ok"),
+            (str(tmp_path / "blocker"), "a.txt", "a"),
+            (str(tmp_path / "blocker"), "b.txt", "b"),
+        ])
+
+        assert success is False
+        assert "'a.txt'" in message and "'b.txt'" in message
+        assert (tmp_path / "ok.txt").read_text() == "ok"
+
+    async def test_push_changes_not_a_git_repository(self, tmp_path, monkeypatch):
+        """Test that push_changes points to repo_setup for a project without .git."""
+        os.makedirs(tmp_path / "project")
+        monkeypatch.chdir(tmp_path)
+
+        result = await push_changes("project")
+
+        assert result == (
+            "Project directory './project' is not a git repository. "
+            "Make sure the project was created using repo_setup first."
+        )
+
+    async def test_push_changes_success(self, mocked_commit):
         """Test successful commit and push."""
-        with patch("os.path.exists") as mock_exists:
-            with patch("main.commit_and_push_changes") as mock_commit:
-                with patch("main.generate_commit_message") as mock_generate:
-                    mock_exists.return_value = True
-                    mock_commit.return_value = (True, "Successfully committed and pushed changes")
-                    mock_generate.return_value = "Auto-commit: Update project files - 2025-01-02 23:05:00"
-                    
-                    result = await push_changes("project")
-                    
-                    assert "Changes committed and pushed successfully!" in result
-                    assert "Auto-Generated Commit Message:" in result
-                    assert "./project" in result
-                    mock_commit.assert_called_once_with("./project", "Auto-commit: Update project files - 2025-01-02 23:05:00")
+        result = await push_changes("project")
+
+        assert "Changes committed and pushed successfully!" in result
+        assert "Auto-Generated Commit Message:" in result
+        assert "./project" in result
+        mocked_commit.assert_called_once_with("./project", "Auto-commit: Update project files - 2025-01-02 23:05:00", paths=None)
     
-    @pytest.mark.asyncio
-    async def test_push_changes_no_changes(self):
+    async def test_push_changes_no_changes(self, mocked_commit):
         """Test push when there are no changes."""
-        with patch("os.path.exists") as mock_exists:
-            with patch("main.commit_and_push_changes") as mock_commit:
-                with patch("main.generate_commit_message") as mock_generate:
-                    mock_exists.return_value = True
-                    mock_commit.return_value = (True, "No changes to commit.")
-                    mock_generate.return_value = "Auto-commit: Update project files - 2025-01-02 23:05:00"
-                    
-                    result = await push_changes("project")
-                    
-                    assert "No changes detected in the project" in result
-                    assert "The project is already up to date" in result
+        mocked_commit.return_value = (True, "No changes to commit.")
+
+        result = await push_changes("project")
+
+        assert "No changes detected in the project" in result
+        assert "The project is already up to date" in result
     
-    @pytest.mark.asyncio
-    async def test_push_changes_empty_project_name(self):
+    @pytest.mark.parametrize("project_name", ["", "   "])
+    async def test_push_changes_empty_project_name(self, project_name):
         """Test push_changes fails with empty project name."""
-        result = await push_changes("")
-        assert "Project name is required and cannot be empty" in result
-        
-        result = await push_changes("   ")
+        result = await push_changes(project_name)
         assert "Project name is required and cannot be empty" in result
     
-    @pytest.mark.asyncio
-    async def test_push_changes_failure(self):
+    async def test_push_changes_failure(self, mocked_commit):
         """Test push_changes handles commit failure."""
-        with patch("os.path.exists") as mock_exists:
-            with patch("main.commit_and_push_changes") as mock_commit:
-                with patch("main.generate_commit_message") as mock_generate:
-                    mock_exists.return_value = True
-                    mock_commit.return_value = (False, "Git push failed")
-                    mock_generate.return_value = "Auto-commit: Update project files - 2025-01-02 23:05:00"
-                    
-                    result = await push_changes("project")
-                    
-                    assert "Failed to push changes: Git push failed" in result
+        mocked_commit.return_value = (False, "Git push failed")
+
+        result = await push_changes("project")
+
+        assert "Failed to push changes: Git push failed" in result
     
-    @pytest.mark.asyncio
-    async def test_push_changes_unexpected_error(self):
+    async def test_push_changes_unexpected_error(self, mocked_commit):
         """Test push_changes handles unexpected errors."""
-        with patch("os.path.exists") as mock_exists:
-            with patch("main.commit_and_push_changes") as mock_commit:
-                with patch("main.generate_commit_message") as mock_generate:
-                    mock_exists.return_value = True
-                    mock_commit.side_effect = Exception("Unexpected error")
-                    mock_generate.return_value = "Auto-commit: Update project files - 2025-01-02 23:05:00"
-                    
-                    result = await push_changes("project")
-                    
-                    assert "Push operation failed due to unexpected error" in result
-                    assert "Unexpected error" in result
+        mocked_commit.side_effect = Exception("Unexpected error")
+
+        result = await push_changes("project")
+
+        assert "Push operation failed due to unexpected error" in result
+        assert "Unexpected error" in result
     
     def test_generate_commit_message(self):
         """Test that generate_commit_message creates a proper commit message."""
@@ -385,48 +1062,201 @@ class TestWebsiteGeneratorMCP:
         assert len(message) > 30  # Should be a reasonable length
         
         # Test that two calls generate different messages (due to timestamp)
-        import time
-        time.sleep(1)  # Wait 1 second
-        message2 = generate_commit_message()
+        clock = iter([datetime(2025, 1, 2, 23, 5, 0), datetime(2025, 1, 2, 23, 5, 1)])
+        message = generate_commit_message(now=lambda: next(clock))
+        message2 = generate_commit_message(now=lambda: next(clock))
+        assert message == "Auto-commit: Update project files - 2025-01-02 23:05:00"
         assert message != message2  # Should be different due to timestamp
+
+    def test_generate_commit_message_unique_within_a_second(self):
+        """Test that messages generated in the same second get a counter suffix."""
+        clock = lambda: datetime(2025, 1, 3, 8, 0, 0, 250000)
+
+        first = generate_commit_message(now=clock)
+        second = generate_commit_message(now=clock)
+        third = generate_commit_message(now=clock)
+
+        assert first == "Auto-commit: Update project files - 2025-01-03 08:00:00"
+        assert second == "Auto-commit: Update project files - 2025-01-03 08:00:00 (2)"
+        assert third == "Auto-commit: Update project files - 2025-01-03 08:00:00 (3)"
     
-    @pytest.mark.asyncio
-    async def test_create_file_in_project_success(self):
+    async def test_create_file_in_project_success(self, tmp_path):
         """Test successful file creation in project."""
-        with tempfile.TemporaryDirectory() as temp_dir:
-            success, message = await create_file_in_project(temp_dir, "test.txt", "Hello World")
-            
-            assert success is True
-            assert "created successfully" in message
-            
-            # Verify file was actually created
-            file_path = os.path.join(temp_dir, "test.txt")
-            assert os.path.exists(file_path)
-            
-            with open(file_path, 'r') as f:
-                content = f.read()
-            assert content == "Hello World"
-    
-    @pytest.mark.asyncio
-    async def test_create_file_in_project_creates_directory(self):
+        temp_dir = str(tmp_path)
+        success, message = await create_file_in_project(temp_dir, "test.txt", "Hello World")
+
+        assert success is True
+        assert "created successfully" in message
+
+        # Verify file was actually created
+        file_path = os.path.join(temp_dir, "test.txt")
+        assert os.path.exists(file_path)
+
+        with open(file_path, 'r') as f:
+            content = f.read()
+        assert content == "Hello World"
+
+    async def test_create_file_in_project_creates_directory(self, tmp_path):
         """Test that create_file_in_project creates directories if they don't exist."""
-        with tempfile.TemporaryDirectory() as temp_dir:
-            nested_path = os.path.join(temp_dir, "src", "components")
-            
-            success, message = await create_file_in_project(nested_path, "Component.js", "export default Component;")
-            
-            assert success is True
-            assert os.path.exists(nested_path)
-            assert os.path.exists(os.path.join(nested_path, "Component.js"))
-    
-    @pytest.mark.asyncio
-    async def test_commit_and_push_changes_no_git_repo(self):
+        nested_path = str(tmp_path / "src" / "components")
+
+        success, message = await create_file_in_project(nested_path, "Component.js", "export default Component;")
+
+        assert success is True
+        assert os.path.exists(nested_path)
+        assert os.path.exists(os.path.join(nested_path, "Component.js"))
+
+    async def test_commit_and_push_changes(self, tmp_path, monkeypatch):
+        """Test that changes are committed and pushed, and a clean tree is left alone."""
+        project_path = str(tmp_path / "test-project")
+        remote_path = str(tmp_path / "remote.git")
+        os.makedirs(project_path)
+        with open(os.path.join(project_path, "index.html"), "w") as f:
+            f.write("<html></html>")
+        await self._make_local_remote(remote_path, monkeypatch)
+        monkeypatch.setenv("GITHUB_TOKEN", "test_token")
+        monkeypatch.setattr("utils.git_operations.load_pygit2", lambda: None)
+        success, message = await push_to_github(
+            project_path, "https://github.com/user/test-project.git", "test-project"
+        )
+        assert success is True, message
+
+        with open(os.path.join(project_path, "index.html"), "w") as f:
+            f.write("<html><body></body></html>")
+        success, message = await commit_and_push_changes(project_path, "Update index")
+
+        assert success is True, message
+        assert "Successfully committed and pushed changes" in message
+        _, log = await run_command(["git", "-C", remote_path, "log", "--format=%s", "main"])
+        assert log.split("\n")[0] == "Update index"
+
+        success, message = await commit_and_push_changes(project_path, "Nothing to do")
+        assert (success, message) == (True, "No changes to commit.")
+
+        # Touching a file without changing it is not a change
+        os.utime(os.path.join(project_path, "index.html"), (0, 0))
+        success, message = await commit_and_push_changes(project_path, "Nothing to do")
+        assert (success, message) == (True, "No changes to commit.")
+
+        # A new untracked file is
+        with open(os.path.join(project_path, "about.html"), "w") as f:
+            f.write("<html></html>")
+        success, message = await commit_and_push_changes(project_path, "Add about page")
+        assert success is True, message
+        _, log = await run_command(["git", "-C", remote_path, "log", "--format=%s", "main"])
+        assert log.split("\n")[0] == "Add about page"
+
+    async def test_commit_and_push_changes_with_paths(self, tmp_path, monkeypatch):
+        """Test that only the listed new files and tracked changes are staged."""
+        project_path = str(tmp_path / "test-project")
+        remote_path = str(tmp_path / "remote.git")
+        os.makedirs(project_path)
+        with open(os.path.join(project_path, "index.html"), "w") as f:
+            f.write("<html></html>")
+        await self._make_local_remote(remote_path, monkeypatch)
+        monkeypatch.setenv("GITHUB_TOKEN", "test_token")
+        monkeypatch.setattr("utils.git_operations.load_pygit2", lambda: None)
+        success, message = await push_to_github(
+            project_path, "https://github.com/user/test-project.git", "test-project"
+        )
+        assert success is True, message
+
+        with open(os.path.join(project_path, "index.html"), "w") as f:
+            f.write("<html><body></body></html>")
+        os.makedirs(os.path.join(project_path, "src"))
+        for name in ("App.jsx", "scratch.txt"):
+            with open(os.path.join(project_path, "src", name), "w") as f:
+                f.write(name)
+        monkeypatch.chdir(tmp_path)
+
+        success, message = await commit_and_push_changes(
+            project_path, "Add App", paths=["./test-project/src/App.jsx"]
+        )
+
+        assert success is True, message
+        _, files = await run_command(["git", "-C", remote_path, "ls-tree", "-r", "--name-only", "main"])
+        assert files.split() == ["index.html", "src/App.jsx"]
+        _, diff = await run_command(["git", "-C", remote_path, "diff", "main~1", "main", "--", "index.html"])
+        assert "<body>" in diff
+
+        # Only unlisted untracked files left: nothing gets committed
+        success, message = await commit_and_push_changes(project_path, "Nothing", paths=[])
+        assert (success, message) == (True, "No changes to commit.")
+
+    async def test_commit_and_push_changes_with_project_relative_paths(self, tmp_path, monkeypatch):
+        """Test that listed paths may be relative to the project, and deletions are staged."""
+        project_path = str(tmp_path / "test-project")
+        remote_path = str(tmp_path / "remote.git")
+        os.makedirs(project_path)
+        for name in ("index.html", "old.html"):
+            with open(os.path.join(project_path, name), "w") as f:
+                f.write("<html></html>")
+        await self._make_local_remote(remote_path, monkeypatch)
+        monkeypatch.setenv("GITHUB_TOKEN", "test_token")
+        monkeypatch.setattr("utils.git_operations.load_pygit2", lambda: None)
+        success, message = await push_to_github(
+            project_path, "https://github.com/user/test-project.git", "test-project"
+        )
+        assert success is True, message
+
+        os.makedirs(os.path.join(project_path, "src"))
+        with open(os.path.join(project_path, "src", "App.jsx"), "w") as f:
+            f.write("export default App;")
+        os.remove(os.path.join(project_path, "old.html"))
+        monkeypatch.chdir(tmp_path)
+
+        success, message = await commit_and_push_changes(
+            project_path, "Add App", paths=["src/App.jsx", "old.html"]
+        )
+
+        assert success is True, message
+        _, files = await run_command(["git", "-C", remote_path, "ls-tree", "-r", "--name-only", "main"])
+        assert files.split() == ["index.html", "src/App.jsx"]
+
+    async def test_commit_and_push_changes_with_missing_path(self, tmp_path, monkeypatch):
+        """Test that a listed path that exists nowhere is reported instead of skipped."""
+        project_path = str(tmp_path / "test-project")
+        os.makedirs(project_path)
+        with open(os.path.join(project_path, "index.html"), "w") as f:
+            f.write("<html></html>")
+        await self._make_local_remote(str(tmp_path / "remote.git"), monkeypatch)
+        monkeypatch.setenv("GITHUB_TOKEN", "test_token")
+        monkeypatch.setattr("utils.git_operations.load_pygit2", lambda: None)
+        success, message = await push_to_github(
+            project_path, "https://github.com/user/test-project.git", "test-project"
+        )
+        assert success is True, message
+        with open(os.path.join(project_path, "index.html"), "w") as f:
+            f.write("<html><body></body></html>")
+
+        success, message = await commit_and_push_changes(
+            project_path, "Add App", paths=["src/Missing.jsx"]
+        )
+
+        assert success is False
+        assert message.startswith("Listed files not found in the project:")
+        assert "Missing.jsx" in message
+
+    async def test_commit_and_push_changes_inside_parent_repo(self, tmp_path):
+        """Test that a project without its own .git isn't committed to a parent repository."""
+        await run_command(["git", "init", "-q", str(tmp_path)])
+        project_path = str(tmp_path / "test-project")
+        os.makedirs(project_path)
+
+        success, message = await commit_and_push_changes(project_path, "Test commit")
+
+        assert success is False
+        assert "Not a git repository" in message
+
+    async def test_commit_and_push_changes_no_git_repo(self, tmp_path):
         """Test commit_and_push_changes fails when not in a git repository."""
-        with tempfile.TemporaryDirectory() as temp_dir:
-            success, message = await commit_and_push_changes(temp_dir, "Test commit")
-            
-            assert success is False
-            assert "Not a git repository" in message
+        temp_dir = str(tmp_path)
+        success, message = await commit_and_push_changes(temp_dir, "Test commit")
+
+        assert (success, message) == (
+            False,
+            "Not a git repository. Please ensure the project is initialized with git.",
+        )
 
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
\ No newline at end of file
@@ -6,9 +6,127 @@ that can be used by the MCP server to interact with the file system.
 """
 
 import os
+import stat
+import asyncio
 import logging
 from typing import Tuple, List, Optional
 
+logger = logging.getLogger(__name__)
+
+# Minimum number of bytes requested per read() call
+READ_CHUNK_SIZE = 64 * 1024
+
+# Error messages shared by the file handling functions
+EMPTY_FILE_PATH_ERROR = "File path is required and cannot be empty."
+EMPTY_DIRECTORY_PATH_ERROR = "Directory path is required and cannot be empty."
+NOT_A_FILE_ERROR = "Path '{}' is not a file."
+
+
+def _stat_or_none(path: str) -> Optional[os.stat_result]:
+    """
+    Stat a path, treating a missing path as None.
+
+    Args:
+        path: Path to stat
+
+    Returns:
+        The stat result, or None if the path does not exist
+    """
+    try:
+        return os.stat(path)
+    except FileNotFoundError:
+        return None
+
+
+def _read_fd(fd: int, size_hint: int) -> bytes:
+    """
+    Read an open file descriptor to EOF.
+
+    Args:
+        fd: File descriptor to read from
+        size_hint: Expected size in bytes, usually st_size from fstat
+
+    Returns:
+        The bytes read
+    """
+    # A regular file is read in one call plus the call that hits EOF; the
+    # loop only matters for files that grow or report a size of 0 (procfs)
+    chunks = []
+    while chunk := os.read(fd, max(size_hint, READ_CHUNK_SIZE)):
+        chunks.append(chunk)
+    return b"".join(chunks)
+
+
+def _read_text_file(file_path: str) -> Optional[str]:
+    """
+    Read a regular file and decode it as UTF-8.
+
+    Args:
+        file_path: Path to the file to read
+
+    Returns:
+        The file contents, or None if the path is not a regular file
+
+    Raises:
+        UnicodeDecodeError: If the file is not valid UTF-8
+    """
+    # O_NONBLOCK keeps the open from hanging on a FIFO; it has no
+    # effect on regular files
+    fd = os.open(file_path, os.O_RDONLY | os.O_NONBLOCK)
+    try:
+        st = os.fstat(fd)
+        if not stat.S_ISREG(st.st_mode):
+            return None
+        data = _read_fd(fd, st.st_size)
+    finally:
+        os.close(fd)
+
+    # Decode the whole buffer in one call rather than chunk by chunk
+    return data.decode("utf-8")
+
+
+def _scan_directory(directory_path: str) -> List[str]:
+    """
+    List the entries of a directory with [DIR]/[FILE] prefixes, directories first.
+
+    Args:
+        directory_path: Path to the directory to list
+
+    Returns:
+        The list of entries
+    """
+    # scandir gets the entry types from the directory read itself, so no
+    # extra stat is needed per entry (only symlinks are resolved)
+    dirs = []
+    files = []
+    with os.scandir(directory_path) as entries:
+        for entry in entries:
+            (dirs if entry.is_dir() else files).append(entry.name)
+
+    # Directories first, each group sorted alphabetically
+    dirs.sort()
+    files.sort()
+    return [f"[DIR] {name}" for name in dirs] + [f"[FILE] {name}" for name in files]
+
+
+def _write_text(file_path: str, content: str) -> None:
+    """
+    Overwrite a file with UTF-8 text.
+
+    Args:
+        file_path: Path to the file to write
+        content: Text to write
+    """
+    data = memoryview(content.encode("utf-8"))
+    # No O_CREAT: update_file only rewrites files that already exist
+    fd = os.open(file_path, os.O_WRONLY | os.O_TRUNC)
+    try:
+        # os.write may write less than asked; the memoryview slices are free
+        while data:
+            data = data[os.write(fd, data) :]
+    finally:
+        os.close(fd)
+
 
 async def read_file(file_path: str) -> Tuple[bool, str]:
     """
@@ -22,33 +140,32 @@ async def read_file(file_path: str) -> Tuple[bool, str]:
     """
     try:
         if not file_path or not file_path.strip():
-            return False, "File path is required and cannot be empty."
+            return False, EMPTY_FILE_PATH_ERROR
 
         file_path = file_path.strip()
 
-        if not os.path.exists(file_path):
-            return False, f"File '{file_path}' does not exist."
+        # Disk I/O and decoding run in a worker thread so they don't block
+        # the event loop
+        content = await asyncio.to_thread(_read_text_file, file_path)
+        if content is None:
+            return False, NOT_A_FILE_ERROR.format(file_path)
 
-        if not os.path.isfile(file_path):
-            return False, f"Path '{file_path}' is not a file."
-
-        with open(file_path, "r", encoding="utf-8") as file:
-            content = file.read()
-
-        logging.info(f"Successfully read file: {file_path}")
+        logger.info("Successfully read file: %s", file_path)
         return True, content
 
+    except FileNotFoundError:
+        return False, f"File '{file_path}' does not exist."
     except PermissionError:
         error_msg = f"Permission denied when reading file: {file_path}"
-        logging.error(error_msg)
+        logger.error(error_msg)
         return False, error_msg
     except UnicodeDecodeError:
         error_msg = f"Unable to decode file as UTF-8: {file_path}"
-        logging.error(error_msg)
+        logger.error(error_msg)
         return False, error_msg
     except Exception as e:
         error_msg = f"Error reading file '{file_path}': {str(e)}"
-        logging.error(error_msg)
+        logger.error(error_msg)
         return False, error_msg
 
 
@@ -64,36 +181,28 @@ async def list_files(directory_path: str) -> Tuple[bool, List[str]]:
     """
     try:
         if not directory_path or not directory_path.strip():
-            return False, "Directory path is required and cannot be empty."
+            return False, EMPTY_DIRECTORY_PATH_ERROR
 
         directory_path = directory_path.strip()
 
-        if not os.path.exists(directory_path):
-            return False, f"Directory '{directory_path}' does not exist."
-
-        if not os.path.isdir(directory_path):
-            return False, f"Path '{directory_path}' is not a directory."
+        # scandir itself reports a missing path or a non-directory, so there
+        # is no separate stat beforehand
+        items = await asyncio.to_thread(_scan_directory, directory_path)
 
-        items = []
-        for item in os.listdir(directory_path):
-            item_path = os.path.join(directory_path, item)
-            if os.path.isdir(item_path):
-                items.append(f"[DIR] {item}")
-            else:
-                items.append(f"[FILE] {item}")
-
-        items.sort()  # Sort alphabetically
-
-        logging.info(f"Successfully listed directory: {directory_path}")
+        logger.info("Successfully listed directory: %s", directory_path)
         return True, items
 
+    except FileNotFoundError:
+        return False, f"Directory '{directory_path}' does not exist."
+    except NotADirectoryError:
+        return False, f"Path '{directory_path}' is not a directory."
     except PermissionError:
         error_msg = f"Permission denied when listing directory: {directory_path}"
-        logging.error(error_msg)
+        logger.error(error_msg)
         return False, error_msg
     except Exception as e:
         error_msg = f"Error listing directory '{directory_path}': {str(e)}"
-        logging.error(error_msg)
+        logger.error(error_msg)
         return False, error_msg
 
 
@@ -110,39 +219,32 @@ async def update_file(file_path: str, new_content: str) -> Tuple[bool, str]:
     """
     try:
         if not file_path or not file_path.strip():
-            return False, "File path is required and cannot be empty."
+            return False, EMPTY_FILE_PATH_ERROR
 
         file_path = file_path.strip()
 
-        if not os.path.exists(file_path):
+        st = _stat_or_none(file_path)
+        if st is None:
             return (
                 False,
                 f"File '{file_path}' does not exist. Use new_file to create a new file.",
             )
 
-        if not os.path.isfile(file_path):
-            return False, f"Path '{file_path}' is not a file."
-
-        # Create backup of original content
-        try:
-            with open(file_path, "r", encoding="utf-8") as file:
-                original_content = file.read()
-        except Exception:
-            original_content = None
+        if not stat.S_ISREG(st.st_mode):
+            return False, NOT_A_FILE_ERROR.format(file_path)
 
         # Write new content
-        with open(file_path, "w", encoding="utf-8") as file:
-            file.write(new_content)
+        await asyncio.to_thread(_write_text, file_path, new_content)
 
         success_msg = f"Successfully updated file: {file_path}"
-        logging.info(success_msg)
+        logger.info(success_msg)
         return True, success_msg
 
     except PermissionError:
         error_msg = f"Permission denied when updating file: {file_path}"
-        logging.error(error_msg)
+        logger.error(error_msg)
         return False, error_msg
     except Exception as e:
         error_msg = f"Error updating file '{file_path}': {str(e)}"
-        logging.error(error_msg)
+        logger.error(error_msg)
         return False, error_msg
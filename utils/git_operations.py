@@ -3,59 +3,621 @@ Git operations module for the website generator MCP server.
 """
 
 import os
+import asyncio
 import logging
-import subprocess
+import shlex
+import signal
+import base64
 import shutil
+import hashlib
+import tempfile
 import datetime
-from typing import Optional
+import functools
+import time
+import contextlib
+from typing import AsyncIterator, Callable, Optional
+
+from utils.github_api import get_github_token
 
 # Default Timeouts
 CLONE_TIMEOUT = 60.0
+TERMINATE_GRACE_PERIOD = 5.0
+
+# Timeout for the batched scripts that stage, commit and push in one process.
+# Each of those used to get CLONE_TIMEOUT on its own, and the push alone may
+# need all of it, so the whole script gets a few times as much.
+SCRIPT_TIMEOUT = 3 * CLONE_TIMEOUT
+
+# Local copies of the template, re-downloaded once the newest is older than
+# the TTL. Each download is a new "<key>-<time_ns>" version directory that is
+# never modified, see get_cached_template()
+TEMPLATE_CACHE_DIR = os.path.join(
+    os.getenv("XDG_CACHE_HOME", os.path.expanduser("~/.cache")), "website-generator"
+)
+TEMPLATE_CACHE_TTL = 3600.0
+
+# Guards each template cache entry against concurrent refreshes
+_template_cache_locks: dict[str, asyncio.Lock] = {}
+
+# Number of copies in progress from each template cache version; superseded
+# versions are only deleted once nothing reads them
+_template_cache_readers: dict[str, int] = {}
+
+# Directory deletions still running in the background, see remove_tree_later()
+_background_removals: set[asyncio.Task] = set()
+
+# Repository URLs the server can push to; pushes authenticate for this prefix
+GITHUB_URL_PREFIX = "https://github.com/"
+
+# Identity used for commits made by the server
+GIT_USER_NAME = "Web Developer"
+GIT_USER_EMAIL = "web@developer.com"
+
+# Marker echoed to stderr before each step of a batched shell script
+STEP_MARKER = "::step="
+
+# Marker echoed to stdout when commit_and_push_changes finds nothing to commit
+NO_CHANGES_MARKER = "::no-changes"
 
+# Second, formatted timestamp and number of messages already generated for
+# that second, see generate_commit_message()
+_last_commit_timestamp: tuple[Optional[datetime.datetime], str, int] = (None, "", 0)
 
-def generate_commit_message() -> str:
+
+def generate_commit_message(
+    now: Callable[[], datetime.datetime] = datetime.datetime.now,
+) -> str:
     """
     Generate an automatic commit message with timestamp.
 
+    The timestamp is only formatted once per second. Further messages in the
+    same second get a counter suffix so that every message is unique.
+
+    Args:
+        now: Clock returning the current time
+
     Returns:
         A formatted commit message string
     """
-    timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    return f"Auto-commit: Update project files - {timestamp}"
+    global _last_commit_timestamp
+    second = now().replace(microsecond=0)
+    last_second, timestamp, count = _last_commit_timestamp
+    if second == last_second:
+        count += 1
+    else:
+        timestamp, count = second.strftime("%Y-%m-%d %H:%M:%S"), 0
+    _last_commit_timestamp = (second, timestamp, count)
+
+    suffix = f" ({count + 1})" if count else ""
+    return f"Auto-commit: Update project files - {timestamp}{suffix}"
+
+
+@functools.lru_cache(maxsize=None)
+def load_pygit2():
+    """
+    Import the optional pygit2 dependency on first use.
+
+    Returns:
+        The pygit2 module, or None if it is not installed
+    """
+    try:
+        import pygit2
+    except ImportError:
+        return None
+    return pygit2
+
+
+@functools.lru_cache(maxsize=None)
+def resolve_executable(name: str) -> str:
+    """
+    Resolve a command name to an absolute path using PATH.
+
+    subprocess only launches children with posix_spawn (vfork) instead of
+    fork+exec when the executable is given as a path.
+
+    Args:
+        name: Command name or path
+
+    Returns:
+        Absolute path of the executable, or the name unchanged if not found
+    """
+    if os.path.dirname(name):
+        return name
+    return shutil.which(name) or name
+
+
+async def stop_process(
+    process: asyncio.subprocess.Process, process_group: bool = False
+) -> None:
+    """
+    Stop a running subprocess and wait for it to exit.
+
+    The process is asked to stop first (git cleans up its lock files on
+    SIGTERM) and only killed if it ignores the request.
+
+    Args:
+        process: Process to stop
+        process_group: Whether the process leads its own process group, in
+            which case the whole group is signalled so that the commands a
+            shell script started don't outlive it
+    """
 
+    def send(sig: int) -> None:
+        try:
+            if process_group:
+                os.killpg(process.pid, sig)
+            elif sig == signal.SIGTERM:
+                process.terminate()
+            else:
+                process.kill()
+        except ProcessLookupError:
+            # Already exited
+            pass
+
+    send(signal.SIGTERM)
+    try:
+        await asyncio.wait_for(process.wait(), timeout=TERMINATE_GRACE_PERIOD)
+    except asyncio.TimeoutError:
+        send(signal.SIGKILL)
+        await process.wait()
 
-def run_command(command: list[str], cwd: Optional[str] = None) -> tuple[bool, str]:
+
+async def run_command(
+    command: list[str],
+    cwd: Optional[str] = None,
+    capture: bool = True,
+    env: Optional[dict[str, str]] = None,
+    input: Optional[bytes] = None,
+    timeout: Optional[float] = None,
+    process_group: bool = False,
+) -> tuple[bool, str]:
     """
-    Run a shell command and return success status and output.
+    Run a command as an asyncio subprocess and return success status and output.
+
+    The event loop keeps serving other requests while the command runs.
 
     Args:
         command: List of command parts
         cwd: Working directory for the command
+        capture: Whether to capture stdout. When False, stdout is discarded
+            and an empty string is returned on success; stderr is always
+            captured for error reporting.
+        env: Environment for the command (defaults to the current environment)
+        input: Data written to the command's stdin
+        timeout: Seconds before the command is stopped (defaults to
+            CLONE_TIMEOUT)
+        process_group: Whether to start the command in its own process
+            group, so that stopping it also stops everything it started
 
     Returns:
         Tuple of (success, output/error_message)
     """
+    if timeout is None:
+        timeout = CLONE_TIMEOUT
+
     try:
-        result = subprocess.run(
-            command, cwd=cwd, capture_output=True, text=True, timeout=CLONE_TIMEOUT
+        # Keep the child eligible for posix_spawn: absolute executable, no
+        # preexec_fn/pass_fds, and close_fds=False (fds opened by Python are
+        # non-inheritable already, so the per-spawn fd-closing walk is wasted).
+        # Callers targeting a repository pass "git -C" rather than cwd, which
+        # would also force the fork+exec path. A new process group forces it
+        # too, so only shell scripts ask for one.
+        process = await asyncio.create_subprocess_exec(
+            resolve_executable(command[0]),
+            *command[1:],
+            cwd=cwd,
+            env=env,
+            close_fds=False,
+            stdin=asyncio.subprocess.PIPE if input is not None else None,
+            stdout=asyncio.subprocess.PIPE if capture else asyncio.subprocess.DEVNULL,
+            stderr=asyncio.subprocess.PIPE,
+            process_group=0 if process_group else None,
         )
 
-        if result.returncode == 0:
-            return True, result.stdout
+        try:
+            stdout, stderr = await asyncio.wait_for(
+                process.communicate(input), timeout=timeout
+            )
+        except asyncio.TimeoutError:
+            await stop_process(process, process_group)
+            return False, f"Command timed out after {timeout} seconds"
+        except asyncio.CancelledError:
+            # The caller gave up on the command, so don't leave it running
+            await stop_process(process, process_group)
+            raise
+
+        # Output is read as bytes and only decoded when it is returned: stdout
+        # when the caller asked for it, stderr only on failure
+        if process.returncode == 0:
+            return True, stdout.decode("utf-8", errors="replace") if capture else ""
         else:
-            return False, result.stderr
+            return False, stderr.decode("utf-8", errors="replace")
 
-    except subprocess.TimeoutExpired:
-        return False, f"Command timed out after {CLONE_TIMEOUT} seconds"
     except Exception as e:
         return False, f"Command failed: {str(e)}"
 
 
+async def run_shell(
+    script: str,
+    cwd: Optional[str] = None,
+    capture: bool = True,
+    env: Optional[dict[str, str]] = None,
+    input: Optional[bytes] = None,
+    timeout: Optional[float] = None,
+) -> tuple[bool, str]:
+    """
+    Run a bash script in a single process and return success status and output.
+
+    The script runs in its own process group, so a timeout or cancellation
+    stops the commands it started along with bash itself.
+
+    Args:
+        script: Shell script to execute with bash
+        cwd: Working directory for the script
+        capture: Whether to capture stdout (see run_command)
+        env: Environment for the script (defaults to the current environment)
+        input: Data written to the script's stdin
+        timeout: Seconds before the script is stopped (see run_command)
+
+    Returns:
+        Tuple of (success, output/error_message)
+    """
+    return await run_command(
+        ["/bin/bash", "-c", script],
+        cwd=cwd,
+        capture=capture,
+        env=env,
+        input=input,
+        timeout=timeout,
+        process_group=True,
+    )
+
+
+def git_in(repo_path: str) -> str:
+    """
+    Return the shell prefix for running git against a repository.
+
+    "git -C" targets the repository without a cwd for the child, which keeps
+    the process eligible for posix_spawn (see run_command) and lets several
+    git commands for different repositories share one script.
+
+    Args:
+        repo_path: Path of the repository
+
+    Returns:
+        The quoted "git -C <repo_path>" prefix
+    """
+    return f"git -C {shlex.quote(repo_path)}"
+
+
+async def run_steps(
+    steps: list[tuple[str, str]],
+    cwd: Optional[str] = None,
+    capture: bool = True,
+    env: Optional[dict[str, str]] = None,
+    input: Optional[bytes] = None,
+    timeout: Optional[float] = None,
+) -> tuple[bool, str]:
+    """
+    Run several shell commands chained with ``&&`` in a single bash process.
+
+    Each command is preceded by a step marker written to stderr so that, on
+    failure, the step that broke the chain can be reported.
+
+    Args:
+        steps: List of (error_message, shell_command) pairs, in execution order
+        cwd: Working directory for the commands
+        capture: Whether to capture stdout (see run_command)
+        env: Environment for the commands (defaults to the current environment)
+        input: Data written to the script's stdin, readable by any of the steps
+        timeout: Seconds before the whole script is stopped (see run_command)
+
+    Returns:
+        Tuple of (success, output/error_message)
+    """
+    script = " && ".join(
+        f"echo {STEP_MARKER}{index} >&2 && {command}"
+        for index, (_, command) in enumerate(steps)
+    )
+    success, output = await run_shell(
+        script, cwd=cwd, capture=capture, env=env, input=input, timeout=timeout
+    )
+    if success:
+        return True, output
+
+    # Attribute the failure to the last step that was started. Without any
+    # marker the script never got to a step (bash failed to launch, or the
+    # output was replaced by a timeout message), so no step is blamed.
+    failed_step = None
+    details = []
+    for line in output.splitlines():
+        if line.startswith(STEP_MARKER):
+            failed_step = int(line[len(STEP_MARKER) :])
+            details = []
+        else:
+            details.append(line)
+
+    if failed_step is None:
+        return False, output
+
+    error_message = steps[failed_step][0]
+    detail = "\n".join(details)
+    return False, f"{error_message}: {detail}" if detail else error_message
+
+
+async def remove_tree(path: str) -> tuple[bool, str]:
+    """
+    Delete a directory tree.
+
+    ``rm -rf`` walks the tree in C without a Python call per entry, which
+    matters for node_modules and .git object stores; shutil.rmtree in a
+    worker thread is the fallback where rm is not available.
+
+    Args:
+        path: Directory to delete (a missing path is not an error)
+
+    Returns:
+        Tuple of (success, output/error_message)
+    """
+    rm = resolve_executable("rm")
+    if os.path.isabs(rm):
+        return await run_command([rm, "-rf", "--", path], capture=False)
+
+    try:
+        await asyncio.to_thread(shutil.rmtree, path)
+        return True, ""
+    except FileNotFoundError:
+        return True, ""
+    except Exception as e:
+        return False, str(e)
+
+
+def remove_tree_later(path: str) -> None:
+    """
+    Delete a directory tree in the background without waiting for it.
+
+    Callers rename the tree out of the way first, so nothing else can see it
+    while the deletion runs.
+
+    Args:
+        path: Directory to delete
+    """
+
+    def log_failure(task: asyncio.Task) -> None:
+        _background_removals.discard(task)
+        success, output = task.result()
+        if not success:
+            logging.warning(f"Failed to remove {path}: {output}")
+
+    task = asyncio.create_task(remove_tree(path))
+    _background_removals.add(task)
+    task.add_done_callback(log_failure)
+
+
+async def wait_for_background_removals() -> None:
+    """
+    Wait until all deletions started by remove_tree_later() have finished.
+    """
+    while _background_removals:
+        await asyncio.wait(set(_background_removals))
+
+
+async def download_template(template_repo: str, staging_dir: str) -> tuple[bool, str]:
+    """
+    Shallow-clone the template repository into a staging directory without its .git folder.
+
+    Args:
+        template_repo: URL of the template repository
+        staging_dir: Scratch directory that receives the clone as "template"
+
+    Returns:
+        Tuple of (success, template_path_or_error)
+    """
+    template_path = os.path.join(staging_dir, "template")
+
+    # Shallow clone: only the tip tree is needed since the history is discarded
+    success, output = await run_command(
+        [
+            "git",
+            "clone",
+            "--quiet",
+            "--depth=1",
+            "--single-branch",
+            "--no-tags",
+            template_repo,
+            template_path,
+        ],
+        capture=False,
+        # Fail instead of waiting on a credential prompt nobody can answer
+        env={**os.environ, "GIT_TERMINAL_PROMPT": "0"},
+    )
+
+    if not success:
+        return False, f"Failed to clone template repository: {output}"
+
+    # Detach the .git folder with a single rename; it is deleted together
+    # with the staging directory
+    git_path = os.path.join(template_path, ".git")
+    if os.path.exists(git_path):
+        try:
+            os.rename(git_path, os.path.join(staging_dir, "git"))
+        except Exception as e:
+            return False, f"Failed to remove .git folder: {str(e)}"
+
+    return True, template_path
+
+
+def template_cache_versions(cache_key: str) -> list[str]:
+    """
+    List the cached versions of a template, newest first.
+
+    Args:
+        cache_key: Cache key of the template repository
+
+    Returns:
+        Paths of the version directories
+    """
+    prefix = f"{cache_key}-"
+    try:
+        names = os.listdir(TEMPLATE_CACHE_DIR)
+    except FileNotFoundError:
+        return []
+
+    versions = [
+        name
+        for name in names
+        if name.startswith(prefix) and name[len(prefix) :].isdigit()
+    ]
+    versions.sort(key=lambda name: int(name[len(prefix) :]), reverse=True)
+    return [os.path.join(TEMPLATE_CACHE_DIR, name) for name in versions]
+
+
+def prune_template_cache(cache_key: str) -> None:
+    """
+    Delete the superseded versions of a template that no copy is reading.
+
+    Args:
+        cache_key: Cache key of the template repository
+    """
+    stale = template_cache_versions(cache_key)[1:]
+    # The unversioned directory is what older releases cached
+    legacy_path = os.path.join(TEMPLATE_CACHE_DIR, cache_key)
+    if os.path.isdir(legacy_path):
+        stale.append(legacy_path)
+
+    for path in stale:
+        if _template_cache_readers.get(path):
+            continue
+        try:
+            # Rename it out of the way first so it can't be mistaken for a
+            # complete version while the deletion runs
+            trash_dir = tempfile.mkdtemp(prefix=".template-", dir=TEMPLATE_CACHE_DIR)
+            os.rename(path, os.path.join(trash_dir, "previous"))
+        except Exception as e:
+            logging.warning(f"Failed to remove old template cache {path}: {str(e)}")
+            continue
+        remove_tree_later(trash_dir)
+
+
+async def get_cached_template(template_repo: str) -> tuple[bool, str]:
+    """
+    Return a local copy of the template, downloading it when missing or stale.
+
+    If a refresh fails but an older copy exists, the older copy is used. The
+    returned directory is registered as being read and stays in place until
+    release_cached_template() is called, even if a refresh supersedes it
+    meanwhile; cached_template() pairs the two calls.
+
+    Args:
+        template_repo: URL of the template repository
+
+    Returns:
+        Tuple of (success, cache_path_or_error)
+    """
+    cache_key = hashlib.sha256(template_repo.encode("utf-8")).hexdigest()[:16]
+
+    async with _template_cache_locks.setdefault(cache_key, asyncio.Lock()):
+        success, cache_path = await refresh_template_cache(template_repo, cache_key)
+        if success:
+            _template_cache_readers[cache_path] = (
+                _template_cache_readers.get(cache_path, 0) + 1
+            )
+        return success, cache_path
+
+
+def release_cached_template(cache_path: str) -> None:
+    """
+    Mark a directory returned by get_cached_template() as no longer read.
+
+    Args:
+        cache_path: Directory returned by get_cached_template()
+    """
+    readers = _template_cache_readers.pop(cache_path, 1) - 1
+    if readers:
+        _template_cache_readers[cache_path] = readers
+    else:
+        cache_key = os.path.basename(cache_path).rpartition("-")[0]
+        prune_template_cache(cache_key)
+
+
+@contextlib.asynccontextmanager
+async def cached_template(template_repo: str) -> AsyncIterator[tuple[bool, str]]:
+    """
+    Hold a local copy of the template for the duration of the block.
+
+    Args:
+        template_repo: URL of the template repository
+
+    Yields:
+        Tuple of (success, cache_path_or_error), see get_cached_template()
+    """
+    success, cache_path = await get_cached_template(template_repo)
+    try:
+        yield success, cache_path
+    finally:
+        if success:
+            release_cached_template(cache_path)
+
+
+async def refresh_template_cache(
+    template_repo: str, cache_key: str
+) -> tuple[bool, str]:
+    """
+    Return the newest cached version of a template, downloading a new one when
+    there is none or it has expired. The caller holds the template's lock.
+
+    Args:
+        template_repo: URL of the template repository
+        cache_key: Cache key of the template repository
+
+    Returns:
+        Tuple of (success, cache_path_or_error)
+    """
+    versions = template_cache_versions(cache_key)
+    newest = versions[0] if versions else None
+    if newest is not None:
+        created_ns = int(newest.rpartition("-")[2])
+        if time.time_ns() - created_ns < TEMPLATE_CACHE_TTL * 1e9:
+            return True, newest
+
+    try:
+        os.makedirs(TEMPLATE_CACHE_DIR, exist_ok=True)
+        staging_dir = tempfile.mkdtemp(prefix=".template-", dir=TEMPLATE_CACHE_DIR)
+    except Exception as e:
+        return False, f"Failed to prepare template cache: {str(e)}"
+
+    try:
+        success, template_path = await download_template(template_repo, staging_dir)
+        if not success:
+            if newest is not None:
+                logging.warning(
+                    f"Using stale template cache for {template_repo}: {template_path}"
+                )
+                return True, newest
+            return False, template_path
+
+        # Publish the download as a new version; copies still reading an
+        # older one keep it until they finish
+        cache_path = os.path.join(TEMPLATE_CACHE_DIR, f"{cache_key}-{time.time_ns()}")
+        os.rename(template_path, cache_path)
+        logging.info(f"Refreshed template cache: {cache_path}")
+        prune_template_cache(cache_key)
+        return True, cache_path
+
+    except Exception as e:
+        return False, f"Failed to update template cache: {str(e)}"
+    finally:
+        remove_tree_later(staging_dir)
+
+
 async def clone_template_to_base_directory(
     project_name: str, base_dir: str, template_repo: str
 ) -> tuple[bool, str]:
     """
-    Clone the template repository directly to the base directory and remove .git folder.
+    Copy the template repository (without .git folder) directly to the base directory.
+
+    The template is served from a local cache so only the first call, and
+    calls after the cache expires, go to the network.
 
     Args:
         project_name: Name of the project
@@ -67,39 +629,148 @@ async def clone_template_to_base_directory(
     """
     project_path = os.path.join(base_dir, project_name)
 
-    # Remove existing directory if it exists
+    # Move an existing directory aside and delete it in the background
     if os.path.exists(project_path):
         try:
-            shutil.rmtree(project_path)
-            logging.info(f"Removed existing directory: {project_path}")
+            trash_dir = tempfile.mkdtemp(prefix=f".{project_name}-", dir=base_dir)
+            os.rename(project_path, os.path.join(trash_dir, project_name))
         except Exception as e:
             return False, f"Failed to remove existing directory: {str(e)}"
+        remove_tree_later(trash_dir)
+        logging.info(f"Removed existing directory: {project_path}")
 
-    # Clone the repository
-    success, output = run_command(["git", "clone", template_repo, project_path])
-
-    if not success:
-        return False, f"Failed to clone template repository: {output}"
+    async with cached_template(template_repo) as (success, cache_path):
+        if not success:
+            return False, cache_path
 
-    # Remove .git folder
-    git_path = os.path.join(project_path, ".git")
-    if os.path.exists(git_path):
         try:
-            shutil.rmtree(git_path)
-            logging.info(f"Removed .git folder from {project_path}")
+            await asyncio.to_thread(
+                shutil.copytree, cache_path, project_path, symlinks=True
+            )
         except Exception as e:
-            return False, f"Failed to remove .git folder: {str(e)}"
+            return False, f"Failed to copy template to project directory: {str(e)}"
 
     logging.info(f"Successfully cloned template to base directory: {project_path}")
     return True, project_path
 
 
+def github_auth_env(github_token: str) -> dict[str, str]:
+    """
+    Build an environment that makes git authenticate to GitHub with a token.
+
+    The token is passed as an HTTP Authorization header through git's
+    environment-based configuration, so it is never written to .git/config
+    or embedded in the remote URL.
+
+    Args:
+        github_token: GitHub token used to authenticate
+
+    Returns:
+        Copy of the current environment with the git configuration added
+    """
+    credentials = base64.b64encode(
+        f"x-access-token:{github_token}".encode("utf-8")
+    ).decode("ascii")
+    return {
+        **os.environ,
+        "GIT_CONFIG_COUNT": "1",
+        "GIT_CONFIG_KEY_0": f"http.{GITHUB_URL_PREFIX}.extraheader",
+        "GIT_CONFIG_VALUE_0": f"AUTHORIZATION: basic {credentials}",
+        "GIT_TERMINAL_PROMPT": "0",
+    }
+
+
+def push_with_pygit2(
+    project_path: str, remote_url: str, project_name: str, github_token: str
+) -> tuple[bool, str]:
+    """
+    Initialize git and push the project to GitHub in-process with libgit2.
+
+    The repository object stays open across index, commit and push, so no
+    git processes are spawned. This call blocks and is meant to be run in a
+    worker thread.
+
+    Args:
+        project_path: Local path to the project
+        remote_url: URL of the "origin" remote
+        project_name: Name of the project
+        github_token: GitHub token used to authenticate the push
+
+    Returns:
+        Tuple of (success, message)
+    """
+    pygit2 = load_pygit2()
+
+    class PushCallbacks(pygit2.RemoteCallbacks):
+        """Remote callbacks that record the refs the server rejected."""
+
+        def __init__(self, credentials):
+            super().__init__(credentials=credentials)
+            self.rejections: list[str] = []
+
+        def push_update_reference(self, refname: str, message: Optional[str]) -> None:
+            if message is not None:
+                self.rejections.append(f"{refname} rejected: {message}")
+
+    step = "Failed to initialize git repository"
+    try:
+        repo = pygit2.init_repository(project_path)
+
+        step = "Failed to configure git user"
+        repo.config["user.name"] = GIT_USER_NAME
+        repo.config["user.email"] = GIT_USER_EMAIL
+
+        step = "Failed to add files to git"
+        repo.index.add_all()
+        repo.index.write()
+        tree = repo.index.write_tree()
+
+        step = "Failed to commit files"
+        signature = pygit2.Signature(GIT_USER_NAME, GIT_USER_EMAIL)
+        repo.create_commit(
+            "refs/heads/main",
+            signature,
+            signature,
+            f"Initial commit for {project_name}",
+            tree,
+            [],
+        )
+
+        step = "Failed to set main branch"
+        repo.set_head("refs/heads/main")
+
+        step = "Failed to add remote origin"
+        remote = repo.remotes.create("origin", remote_url)
+        repo.config["branch.main.remote"] = "origin"
+        repo.config["branch.main.merge"] = "refs/heads/main"
+
+        step = "Failed to push to GitHub"
+        callbacks = PushCallbacks(
+            credentials=pygit2.UserPass("x-access-token", github_token)
+        )
+        remote.push(["refs/heads/main:refs/heads/main"], callbacks=callbacks)
+
+    except Exception as e:
+        return False, f"{step}: {str(e)}"
+
+    # Remote.push returns normally when the server rejects a ref (hooks,
+    # push protection, rulesets); the rejection only shows up in the callback
+    if callbacks.rejections:
+        return False, f"{step}: " + "; ".join(callbacks.rejections)
+
+    return True, "Successfully pushed to GitHub"
+
+
 async def push_to_github(
     project_path: str, repo_url: str, project_name: str
 ) -> tuple[bool, str]:
     """
     Initialize git and push the project to GitHub.
 
+    Uses pygit2 when it is installed and the git CLI otherwise. The
+    GIT_BACKEND environment variable ("cli" or "pygit2") overrides the
+    automatic choice.
+
     Args:
         project_path: Local path to the project
         repo_url: GitHub repository URL
@@ -108,58 +779,99 @@ async def push_to_github(
     Returns:
         Tuple of (success, message)
     """
-    github_token = os.getenv("GITHUB_TOKEN")
+    github_token = get_github_token()
     if not github_token:
         return False, "GitHub token is required for pushing to repository"
 
-    if repo_url.startswith("https://github.com/"):
-        authenticated_url = repo_url.replace(
-            "https://github.com/", f"https://{github_token}@github.com/"
-        )
-    else:
+    # Expect https://github.com/<owner>/<repo>; the token is only sent to
+    # GitHub (see github_auth_env), never embedded in the URL
+    owner, _, repo = repo_url.removeprefix(GITHUB_URL_PREFIX).partition("/")
+    if not repo_url.startswith(GITHUB_URL_PREFIX) or not owner or not repo:
         return False, f"Unsupported repository URL format: {repo_url}"
 
-    # Step 1: Initialize Git repo
-    success, output = run_command(["git", "init"], cwd=project_path)
-    if not success:
-        return False, f"Failed to initialize git repository: {output}"
-
-    # Step 2: Set Git user config (local only)
-    run_command(["git", "config", "user.name", "Web Developer"], cwd=project_path)
-    run_command(["git", "config", "user.email", "web@developer.com"], cwd=project_path)
+    backend = os.getenv("GIT_BACKEND", "auto").lower()
+    pygit2 = None if backend == "cli" else load_pygit2()
+    if backend == "pygit2" and pygit2 is None:
+        return False, "GIT_BACKEND is set to pygit2 but pygit2 is not installed"
 
-    # Step 3: Add files
-    success, output = run_command(["git", "add", "."], cwd=project_path)
-    if not success:
-        return False, f"Failed to add files to git: {output}"
+    if pygit2 is not None:
+        return await asyncio.to_thread(
+            push_with_pygit2,
+            project_path,
+            repo_url,
+            project_name,
+            github_token,
+        )
 
-    # Step 4: Commit
-    success, output = run_command(
-        ["git", "commit", "-m", f"Initial commit for {project_name}"], cwd=project_path
+    # Initialize, commit, wire up the remote and push in one shell process
+    git = git_in(project_path)
+    commit_message = shlex.quote(f"Initial commit for {project_name}")
+    success, output = await run_steps(
+        [
+            ("Failed to initialize git repository", f"{git} init"),
+            # Staging only touches .git/index, so it runs in the background
+            # while the config and remote writes (which all take
+            # .git/config.lock and therefore stay sequential) go ahead. Its
+            # stderr is kept aside and replayed when it is waited for, so a
+            # failure is reported under the right step. The exit trap also
+            # waits for it, so a step failing in between doesn't leave it
+            # running (and holding .git/index.lock) after the script exits.
+            # The trap doesn't run when the script is killed on a timeout;
+            # run_shell's process group takes the add down in that case.
+            (
+                "Failed to add files to git",
+                "add_log=$(mktemp) && "
+                'trap \'wait "$add_pid" 2>/dev/null; rm -f "$add_log"\' EXIT && '
+                f'{{ {git} add . 2>"$add_log" & }} && add_pid=$!',
+            ),
+            (
+                "Failed to configure git user",
+                f"{git} config user.name {shlex.quote(GIT_USER_NAME)} && "
+                f"{git} config user.email {shlex.quote(GIT_USER_EMAIL)}",
+            ),
+            (
+                "Failed to add remote origin",
+                f"{git} remote add origin {shlex.quote(repo_url)}",
+            ),
+            (
+                "Failed to add files to git",
+                '{ wait "$add_pid"; add_status=$?; cat "$add_log" >&2; '
+                '[ "$add_status" -eq 0 ]; }',
+            ),
+            # Plumbing instead of "git commit" + "git branch -M": no hooks run
+            # and main is written directly
+            (
+                "Failed to commit files",
+                f"tree=$({git} write-tree) && "
+                f'commit=$({git} commit-tree "$tree" -m {commit_message}) && '
+                f'{git} update-ref refs/heads/main "$commit" && '
+                f"{git} symbolic-ref HEAD refs/heads/main",
+            ),
+            ("Failed to push to GitHub", f"{git} push -q -u origin main"),
+        ],
+        capture=False,
+        env=github_auth_env(github_token),
+        timeout=SCRIPT_TIMEOUT,
     )
     if not success:
-        return False, f"Failed to commit files: {output}"
+        return False, output
 
-    # Step 5: Add remote origin
-    success, output = run_command(
-        ["git", "remote", "add", "origin", authenticated_url], cwd=project_path
-    )
-    if not success:
-        return False, f"Failed to add remote origin: {output}"
+    return True, "Successfully pushed to GitHub"
 
-    # Step 6: Set branch to main
-    success, output = run_command(["git", "branch", "-M", "main"], cwd=project_path)
-    if not success:
-        return False, f"Failed to set main branch: {output}"
 
-    # Step 7: Push to GitHub
-    success, output = run_command(
-        ["git", "push", "-u", "origin", "main"], cwd=project_path
-    )
-    if not success:
-        return False, f"Failed to push to GitHub: {output}"
+def write_text_file(file_path: str, content: str) -> None:
+    """
+    Create or overwrite a file with UTF-8 text.
 
-    return True, "Successfully pushed to GitHub"
+    Args:
+        file_path: Path of the file to write
+        content: Text to write
+    """
+    # Encode once and write the bytes in binary mode: skips the text layer's
+    # incremental encoder, and a write larger than the buffer goes straight
+    # to the file in one call
+    with open(file_path, "wb") as file:
+        file.write(content.encode("utf-8"))
 
 
 async def create_file_in_project(
@@ -177,17 +889,16 @@ async def create_file_in_project(
         Tuple of (success, message)
     """
     try:
-        # Ensure the directory exists
-        if not os.path.exists(file_path):
-            os.makedirs(file_path, exist_ok=True)
-            logging.info(f"Created directory: {file_path}")
+        # Ensure the directory exists; with exist_ok this is a single mkdir
+        # attempt, so there is no separate existence check beforehand
+        os.makedirs(file_path, exist_ok=True)
 
         # Create the full file path
         full_file_path = os.path.join(file_path, file_name)
 
-        # Write content to the file
-        with open(full_file_path, "w", encoding="utf-8") as file:
-            file.write(content)
+        # Write content to the file in a worker thread so a large file
+        # doesn't block the event loop
+        await asyncio.to_thread(write_text_file, full_file_path, content)
 
         logging.info(f"Successfully created file: {full_file_path}")
         return True, f"File '{file_name}' created successfully at '{file_path}'"
@@ -198,54 +909,175 @@ async def create_file_in_project(
         return False, error_msg
 
 
-async def commit_and_push_changes(
-    project_path: str, commit_message: str
+async def create_files_in_project(
+    files: list[tuple[str, str, str]],
 ) -> tuple[bool, str]:
     """
-    Check for changes, commit them, and push to the remote repository.
+    Create several files concurrently.
+
+    The writes run in worker threads, so scaffolding N files costs about as
+    long as the slowest write instead of the sum of all of them.
+
+    Args:
+        files: List of (file_path, file_name, content) tuples
+
+    Returns:
+        Tuple of (success, message); on failure the message lists every file
+        that could not be created
+    """
+    results = await asyncio.gather(
+        *(
+            create_file_in_project(file_path, file_name, content)
+            for file_path, file_name, content in files
+        )
+    )
+
+    errors = [message for success, message in results if not success]
+    if errors:
+        return False, "\n".join(errors)
+
+    return True, f"{len(files)} files created successfully"
+
+
+def stage_paths_steps(
+    project_path: str, paths: list[str]
+) -> tuple[list[tuple[str, str]], bytes]:
+    """
+    Build the run_steps steps that stage only the given paths.
+
+    "git add ." walks the whole work tree looking for new files. When the
+    caller knows which files it wrote, tracked files are refreshed with
+    "git add -u" and only the listed paths are added, read NUL-separated
+    from stdin so that no path list ends up on a command line.
 
     Args:
         project_path: Local path to the project repository
-        commit_message: Message for the commit
+        paths: Files to stage, relative to the current directory, relative to
+            the project, or absolute
 
     Returns:
-        Tuple of (success, message)
+        Tuple of (steps, stdin_data) for run_steps
     """
-    try:
-        # Check if we're in a git repository
-        if not os.path.exists(os.path.join(project_path, ".git")):
-            return (
-                False,
-                "Not a git repository. Please ensure the project is initialized with git.",
+    git = git_in(project_path)
+    project_dir = os.path.abspath(project_path)
+
+    def in_project(path: str) -> bool:
+        return os.path.commonpath([project_dir, path]) == project_dir
+
+    # git -C resolves relative pathspecs against the repository, so resolve
+    # each path to an absolute one inside the project
+    existing = []
+    missing = []
+    for path in paths:
+        candidates = [
+            candidate
+            for candidate in (
+                os.path.abspath(path),
+                os.path.join(project_dir, path),
             )
+            if in_project(candidate)
+        ]
+        found = next((c for c in candidates if os.path.lexists(c)), None)
+        if found is not None:
+            existing.append(found)
+        else:
+            missing.append(candidates[0] if candidates else os.path.abspath(path))
 
-        # Check for changes
-        success, output = run_command(
-            ["git", "status", "--porcelain"], cwd=project_path
+    steps = []
+    # A listed path that is gone from disk is only fine if git tracks it (a
+    # deleted file, staged by "add -u"); anything else is reported instead of
+    # silently committing less than the caller asked for
+    if missing:
+        steps.append(
+            (
+                "Listed files not found in the project",
+                f"{git} ls-files --error-unmatch -- "
+                f"{' '.join(shlex.quote(path) for path in missing)} >/dev/null",
+            )
         )
-        if not success:
-            return False, f"Failed to check git status: {output}"
+    steps.append(("Failed to stage changes", f"{git} add -u"))
+    if existing:
+        steps.append(
+            (
+                "Failed to stage changes",
+                f"{git} add -A --pathspec-from-file=- --pathspec-file-nul",
+            )
+        )
+    # The check before staging also counts untracked files the caller didn't
+    # list, so make sure something was actually staged before committing
+    steps.append(
+        (
+            "Failed to check git status",
+            f"if {git} diff-index --cached --quiet HEAD --; "
+            f"then echo {NO_CHANGES_MARKER}; exit 0; fi",
+        )
+    )
+    return steps, b"\0".join(path.encode("utf-8") for path in existing)
 
-        # If no changes, return early
-        if not output.strip():
-            return True, "No changes to commit."
 
-        # Stage all changes
-        success, output = run_command(["git", "add", "."], cwd=project_path)
-        if not success:
-            return False, f"Failed to stage changes: {output}"
+async def commit_and_push_changes(
+    project_path: str, commit_message: str, paths: Optional[list[str]] = None
+) -> tuple[bool, str]:
+    """
+    Check for changes, commit them, and push to the remote repository.
 
-        # Commit changes
-        success, output = run_command(
-            ["git", "commit", "-m", commit_message], cwd=project_path
+    Args:
+        project_path: Local path to the project repository
+        commit_message: Message for the commit
+        paths: Files to stage besides changes to already tracked files, relative
+            to the current directory or absolute. By default every change in
+            the project, including all untracked files, is staged.
+
+    Returns:
+        Tuple of (success, message)
+    """
+    try:
+        # Check the repository, check for changes, stage, commit and push in
+        # one shell process. With nothing to commit the script prints a
+        # marker and stops early.
+        git = git_in(project_path)
+        github_token = get_github_token()
+        if paths is None:
+            staging_steps = [("Failed to stage changes", f"{git} add .")]
+            staged_paths = None
+        else:
+            staging_steps, staged_paths = stage_paths_steps(project_path, paths)
+        success, output = await run_steps(
+            [
+                # Only a .git in the project itself counts: git would also
+                # accept a parent directory's repository
+                (
+                    "Not a git repository. Please ensure the project is initialized with git.",
+                    f"[ -e {shlex.quote(os.path.join(project_path, '.git'))} ]",
+                ),
+                # diff-index stops at the first change instead of listing the
+                # whole tree like "status --porcelain"; the refresh keeps files
+                # that were only touched from counting as changed, and
+                # ls-files picks up new files, which diff-index doesn't see
+                (
+                    "Failed to check git status",
+                    f"{{ {git} update-index -q --refresh || true; }} && "
+                    f"if {git} diff-index --quiet HEAD -- && "
+                    f'[ -z "$({git} ls-files --others --exclude-standard '
+                    f'--directory --no-empty-directory | head -c 1)" ]; '
+                    f"then echo {NO_CHANGES_MARKER}; exit 0; fi",
+                ),
+                *staging_steps,
+                (
+                    "Failed to commit changes",
+                    f"{git} commit -q -m {shlex.quote(commit_message)}",
+                ),
+                ("Failed to push changes", f"{git} push -q"),
+            ],
+            env=github_auth_env(github_token) if github_token else None,
+            input=staged_paths,
+            timeout=SCRIPT_TIMEOUT,
         )
         if not success:
-            return False, f"Failed to commit changes: {output}"
+            return False, output
 
-        # Push changes to remote
-        success, output = run_command(["git", "push"], cwd=project_path)
-        if not success:
-            return False, f"Failed to push changes: {output}"
+        if output.startswith(NO_CHANGES_MARKER):
+            return True, "No changes to commit."
 
         return (
             True,
@@ -3,15 +3,162 @@ GitHub API integration module for the website generator MCP server.
 """
 
 import os
+import json
+import asyncio
 import logging
+import importlib.util
 from typing import Any, Optional, Literal
 import httpx
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # GitHub API Configuration
 GITHUB_API_BASE = "https://api.github.com"
 USER_AGENT = "website-generator-mcp/1.0.0"
 DEFAULT_TIMEOUT = 30.0
 
+# Methods whose payload is sent as a JSON body
+METHODS_WITH_BODY = frozenset({"POST", "PUT"})
+
+# Connection pool limits for the shared HTTP client
+HTTP_LIMITS = httpx.Limits(max_keepalive_connections=20, max_connections=50)
+
+# HTTP/2 needs the optional h2 package (httpx[http2])
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+# Retries for responses GitHub asks to be retried later
+RETRY_STATUS_CODES = frozenset({429, 502, 503, 504})
+MAX_RETRIES = 3
+RETRY_BACKOFF = 1.0
+MAX_RETRY_DELAY = 60.0
+
+# Parses a response body straight from bytes; orjson is used when installed
+parse_json = orjson.loads if orjson is not None else json.loads
+
+# Cached GITHUB_TOKEN value, see get_github_token()
+_github_token: Optional[str] = None
+
+# Cached Authorization header for that token, see get_auth_headers()
+_auth_headers: Optional[dict[str, str]] = None
+
+# HTTP client shared by all API calls, see get_http_client()
+_http_client: Optional[httpx.AsyncClient] = None
+
+
+def get_github_token() -> Optional[str]:
+    """
+    Return the GitHub token from the GITHUB_TOKEN environment variable.
+
+    The value is read once and cached; while it is unset the environment is
+    checked again on every call.
+
+    Returns:
+        The GitHub token, or None if it is not set
+    """
+    global _github_token
+    if _github_token is None:
+        _github_token = os.getenv("GITHUB_TOKEN")
+    return _github_token
+
+
+def refresh_github_token() -> None:
+    """
+    Drop the cached GitHub token so the next lookup re-reads the environment.
+    """
+    global _github_token, _auth_headers
+    _github_token = None
+    _auth_headers = None
+
+
+def get_auth_headers() -> Optional[dict[str, str]]:
+    """
+    Return the Authorization header for the GitHub token.
+
+    The header dict is built once per token and reused by every request.
+
+    Returns:
+        The header dict, or None if no token is set
+    """
+    global _auth_headers
+    if _auth_headers is None:
+        github_token = get_github_token()
+        if github_token:
+            _auth_headers = {"Authorization": f"token {github_token}"}
+    return _auth_headers
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """
+    Return the HTTP client shared by all GitHub API calls.
+
+    Reusing one client keeps connections to api.github.com alive between
+    calls, so only the first request pays for the TCP and TLS handshakes.
+    With h2 installed the client speaks HTTP/2, and concurrent calls share a
+    single connection instead of opening one each.
+
+    Returns:
+        The shared httpx.AsyncClient, created on first use
+    """
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(
+            base_url=GITHUB_API_BASE,
+            headers={
+                "User-Agent": USER_AGENT,
+                "Accept": "application/vnd.github.v3+json",
+            },
+            timeout=DEFAULT_TIMEOUT,
+            limits=HTTP_LIMITS,
+            http2=HTTP2_AVAILABLE,
+        )
+    return _http_client
+
+
+async def close_http_client() -> None:
+    """
+    Close the shared HTTP client and its pooled connections.
+    """
+    global _http_client
+    if _http_client is not None:
+        client, _http_client = _http_client, None
+        await client.aclose()
+
+
+def get_retry_delay(response: httpx.Response, attempt: int) -> Optional[float]:
+    """
+    Return how long to wait before retrying a request, if it should be retried.
+
+    Server errors and rate limits are retried with exponential backoff, or
+    after the delay given by a Retry-After header.
+
+    Args:
+        response: Response to the previous attempt
+        attempt: Number of the previous attempt, starting at 0
+
+    Returns:
+        The delay in seconds, or None if the request should not be retried
+    """
+    retry_after = response.headers.get("Retry-After")
+    # GitHub reports secondary rate limits as 403 with a Retry-After header
+    if response.status_code not in RETRY_STATUS_CODES and not (
+        response.status_code == 403 and retry_after is not None
+    ):
+        return None
+
+    if retry_after is None:
+        delay = RETRY_BACKOFF * 2**attempt
+    else:
+        try:
+            delay = float(retry_after)
+        except ValueError:
+            return None
+
+    # Waiting longer would stall the tool call; report the failure instead
+    return delay if delay <= MAX_RETRY_DELAY else None
+
 
 async def make_github_request(
     method: Literal["GET", "POST", "PUT", "DELETE"],
@@ -22,6 +169,9 @@ async def make_github_request(
     """
     Makes an HTTP request to the GitHub API.
 
+    Server errors and rate limits are retried up to MAX_RETRIES times (see
+    get_retry_delay).
+
     Args:
         method: HTTP method ('GET', 'POST', 'PUT', 'DELETE').
         endpoint: API endpoint path (e.g., '/user/repos').
@@ -31,51 +181,53 @@ async def make_github_request(
     Returns:
         The parsed JSON response as a dictionary on success, None on failure.
     """
-    # Check for token at request time, not import time
-    github_token = os.getenv("GITHUB_TOKEN")
-    if not github_token:
+    # Check for token at request time, not import time. User-Agent and
+    # Accept are set on the shared client.
+    headers = get_auth_headers()
+    if not headers:
         logging.error("GitHub Token is missing. Cannot make API request.")
         return None
 
-    headers = {
-        "User-Agent": USER_AGENT,
-        "Accept": "application/vnd.github.v3+json",
-        "Authorization": f"token {github_token}",
-    }
-
-    # Construct full URL
+    # Full URL for log messages; requests pass the endpoint relative to the
+    # client's base_url
     url = f"{GITHUB_API_BASE}{endpoint}"
 
-    async with httpx.AsyncClient() as client:
-        try:
-            if method == "POST":
-                response = await client.post(
-                    url, json=payload, headers=headers, timeout=timeout
-                )
-            elif method == "PUT":
-                response = await client.put(
-                    url, json=payload, headers=headers, timeout=timeout
-                )
-            elif method == "DELETE":
-                response = await client.delete(url, headers=headers, timeout=timeout)
-            else:  # Default to GET
-                response = await client.get(url, headers=headers, timeout=timeout)
-
-            response.raise_for_status()  # Raise exception for 4xx or 5xx status codes
-            return response.json()
-
-        except httpx.HTTPStatusError as e:
-            logging.error(
-                f"HTTP error calling {method} {url}: {e.response.status_code} - {e.response.text}"
+    client = get_http_client()
+    try:
+        for attempt in range(MAX_RETRIES + 1):
+            response = await client.request(
+                method,
+                endpoint,
+                json=payload if method in METHODS_WITH_BODY else None,
+                headers=headers,
+                timeout=timeout,
+            )
+
+            delay = (
+                get_retry_delay(response, attempt) if attempt < MAX_RETRIES else None
             )
-        except httpx.RequestError as e:
-            logging.error(f"Request error calling {method} {url}: {str(e)}")
-        except Exception as e:
-            logging.error(
-                f"An unexpected error occurred calling {method} {url}: {str(e)}"
+            if delay is None:
+                break
+            logging.warning(
+                f"{method} {url} returned {response.status_code}, retrying in {delay}s"
             )
+            await asyncio.sleep(delay)
 
-        return None
+        response.raise_for_status()  # Raise exception for 4xx or 5xx status codes
+        # Parse the raw body instead of response.json(), which decodes it to
+        # a str first
+        return parse_json(response.content)
+
+    except httpx.HTTPStatusError as e:
+        logging.error(
+            f"HTTP error calling {method} {url}: {e.response.status_code} - {e.response.text}"
+        )
+    except httpx.RequestError as e:
+        logging.error(f"Request error calling {method} {url}: {str(e)}")
+    except Exception as e:
+        logging.error(f"An unexpected error occurred calling {method} {url}: {str(e)}")
+
+    return None
 
 
 async def create_github_repository(